@@ -0,0 +1,44 @@
+"""This is a script to benchmark the extraction, synchronization and writing
+hot loop on synthetic sensor data, and to compare runs against a saved
+baseline.
+"""
+import sys
+import argparse
+
+from src.ecarla import standin
+
+# Simulation modules run on the local stand-in
+standin.install()
+
+from src.ecarla.bench import BenchSuite, REGRESSION_THRESHOLD
+from src.ecarla.bench import save_results, load_results, compare_results, print_comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="eCARLA hot loop benchmarks.")
+    parser.add_argument("--save", default=None, help="Save results as baseline JSON.")
+    parser.add_argument("--compare", default=None, help="Compare against baseline JSON.")
+    parser.add_argument(
+        "--threshold", type=float, default=REGRESSION_THRESHOLD,
+        help="Relative slowdown flagged as a regression."
+    )
+    parser.add_argument("--filter", default=None, help="Only run cases containing this text.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per case.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round.")
+    args = parser.parse_args()
+
+    # Run benchmarks
+    bench_suite = BenchSuite(repeat=args.repeat, min_time=args.min_time, pattern=args.filter)
+    results = bench_suite.run()
+    if args.save is not None:
+        save_results(results, args.save)
+        print("# === Baseline Saved To", args.save, "=== #")
+
+    # Flag regressions, failing the run if any
+    if args.compare is not None:
+        rows = compare_results(
+            load_results(args.compare), results,
+            threshold=args.threshold, pattern=args.filter
+        )
+        if print_comparison(rows) > 0:
+            sys.exit(1)
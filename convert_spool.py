@@ -0,0 +1,19 @@
+"""This is an example script to convert a raw sensor spool, captured by the
+scenario reader with a "spool_dir", to the eWiz format.
+"""
+from src.ecarla.convert import SpoolConverter
+
+
+if __name__ == "__main__":
+    # Main directories
+    spool_dir = ""
+    out_path = ""
+
+    # Convert spool on all cores
+    spool_converter = SpoolConverter(
+        spool_dir=spool_dir,
+        out_path=out_path,
+        extract_options={"gray": {"uint8": True}, "flow": {}},
+        num_workers=None
+    )
+    spool_converter.run()
@@ -20,7 +20,12 @@ class CreateScenario():
         record_start_time: float = 20.0,
         record_delta_time: float = 60.0,
         num_vehicles: int = None,
-        num_peds: int = None
+        num_peds: int = None,
+        driver: str = "manual",
+        route: List[Any] = None,
+        headless: bool = False,
+        tm_port: int = 8000,
+        seed: int = None
     ) -> None:
         # Create required actors for scenario creator
         cam_transform = carla.Transform(
@@ -33,6 +38,9 @@ class CreateScenario():
             "transform": cam_transform,
             "converter": None
         }]
+        # Camera only feeds the window
+        if headless:
+            sensors = []
 
         # Run scenario creator
         scenario_creator = ScenarioCreator(
@@ -45,11 +53,15 @@ class CreateScenario():
             world_map=world_map,
             world_weather=world_weather,
             client_timeout=5.0,
-            init_sleep=0.0,
             vehicle_type=vehicle_type,
             record_start_time=record_start_time,
             record_delta_time=record_delta_time,
             num_vehicles=num_vehicles,
-            num_peds=num_peds
+            num_peds=num_peds,
+            driver=driver,
+            route=route,
+            headless=headless,
+            tm_port=tm_port,
+            seed=seed
         )
         scenario_creator.loop()
@@ -0,0 +1,47 @@
+"""This is an example script to record autopilot scenarios for every town and
+weather combination, without a window or a human driver.
+"""
+import os
+
+import carla
+
+from create import CreateScenario
+
+
+if __name__ == "__main__":
+    # Main directory, recordings are saved by the simulator
+    out_dir = ""
+
+    # Recording name associations, parsed back by the batch converter
+    towns_assoc = {
+        "Town02": "_town2_",
+        "Town04": "_town4_",
+        "Town07": "_town7_",
+        "Town10HD": "_town10_"
+    }
+    weather_assoc = {
+        "ClearSunset": "_clear-sunset",
+        "ClearNoon": "_clear-noon",
+        "CloudySunset": "_cloudy-sunset",
+        "CloudyNoon": "_cloudy-noon"
+    }
+
+    # Setup simulation
+    client = carla.Client("localhost", 2000)
+    resolution = (720, 1080)
+    vehicle_type = "vehicle.tesla.cybertruck"
+    record_start_time = 20
+    record_delta_time = 60
+    num_vehicles = 30
+    num_peds = 20
+
+    # Record every town and weather, ticking as fast as the server allows
+    for world_map, town_name in towns_assoc.items():
+        for world_weather, weather_name in weather_assoc.items():
+            out_path = os.path.join(out_dir, "dynamic" + town_name + "autopilot" + weather_name + ".log")
+            print("Recording:", out_path + "...")
+            CreateScenario(
+                client, resolution, out_path, world_map, world_weather, vehicle_type,
+                record_start_time, record_delta_time, num_vehicles, num_peds,
+                driver="autopilot", headless=True, seed=0
+            )
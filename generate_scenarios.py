@@ -1,26 +1,8 @@
 import os
-import shutil
 
 import carla
 
-from read import ReadScenario
-
-from typing import Dict, List
-
-
-def get_town_and_weather_names(
-        filename: str, towns_assoc: Dict, weather_assoc: Dict
-    ) -> List:
-    """Gets town and weather names.
-    """
-    world_info = []
-    for town_name in towns_assoc.keys():
-        if town_name in filename:
-            world_info.append(towns_assoc[town_name])
-    for weather_name in weather_assoc.keys():
-        if weather_name in filename:
-            world_info.append(weather_assoc[weather_name])
-    return world_info
+from src.ecarla.batch import index_recordings, BatchPool
 
 
 if __name__ == "__main__":
@@ -77,29 +59,31 @@ if __name__ == "__main__":
         }
     ]
 
-    for subdir, dirs, files in os.walk(data_dir):
-        for file in files:
-            file_path = os.path.join(subdir, file)
-            town_name, town_weather = get_town_and_weather_names(file, towns_assoc, weather_assoc)
-            save_path = os.path.join(out_dir, os.path.splitext(os.path.basename(file))[0])
-            print("Processing:", file_path + "...")
+    # Index recordings, grouped by town when scheduled
+    jobs = index_recordings(data_dir, out_dir, towns_assoc, weather_assoc)
 
-            # Setup simulation
-            client = carla.Client("localhost", 2000)
-            resolution = (260, 346)
-            out_path = save_path
-            sensors = sensors
-            start_time = 1.0
-            delta_time = 0.001
-            world_map = town_name
-            world_weather = town_weather
-            record_path = file_path
-            record_delta_time = 60.0
+    # Simulation servers as (host, port, traffic manager port)
+    endpoints = [
+        ("localhost", 2000, 8000)
+    ]
+
+    # Setup simulation
+    resolution = (260, 346)
+    start_time = 1.0
+    delta_time = 0.001
+    record_delta_time = 60.0
 
-            # Run scenario
-            read_scenario = ReadScenario(
-                client, resolution, out_path,
-                sensors, start_time, delta_time,
-                world_map, world_weather,
-                record_path, record_delta_time
-            )
+    # Run all scenarios, one worker per server, skipping up-to-date outputs
+    batch_pool = BatchPool(
+        endpoints=endpoints,
+        jobs=jobs,
+        manifest_path=os.path.join(out_dir, "manifest.json"),
+        resolution=resolution,
+        sensors=sensors,
+        start_time=start_time,
+        delta_time=delta_time,
+        record_delta_time=record_delta_time,
+        client_timeout=5.0,
+        headless=True
+    )
+    batch_pool.run()
@@ -20,7 +20,10 @@ class ReadScenario():
         world_map: str = None,
         world_weather: str = None,
         record_path: str = None,
-        record_delta_time: float = 60.0
+        record_delta_time: float = 60.0,
+        extract_options: Dict[str, Dict[str, Any]] = None,
+        pipelined: bool = False,
+        headless: bool = False
     ) -> None:
         # TODO: Modify hard-coded arguments
         # Run scenario reader
@@ -34,8 +37,10 @@ class ReadScenario():
             world_map=world_map,
             world_weather=world_weather,
             client_timeout=5.0,
-            init_sleep=0.0,
             record_path=record_path,
-            record_delta_time=record_delta_time
+            record_delta_time=record_delta_time,
+            extract_options=extract_options,
+            pipelined=pipelined,
+            headless=headless
         )
         scenario_reader.loop()
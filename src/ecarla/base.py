@@ -1,11 +1,13 @@
-import time
+import warnings
 
 import carla
 import pygame
 
-from .utils.game import Game
-from .utils.sensor import Sensor
+from .utils.game import Game, HeadlessGame
+from .utils.sensor import Sensor, spawn_sensors
 from .utils.sync import SensorSync
+from .utils.ready import wait_until, get_map_name
+from .utils.cache import get_map_cache
 
 from typing import Any, Dict, List, Tuple, Callable
 
@@ -24,7 +26,12 @@ class ScenarioBase():
         world_map: str = None,
         world_weather: str = None,
         client_timeout: float = 10.0,
-        init_sleep: float = 10.0
+        init_timeout: float = 30.0,
+        headless: bool = False,
+        preview_fps: float = None,
+        cache_dir: str = None,
+        tm_port: int = None,
+        init_sleep: float = None
     ) -> None:
         self.client = client
         self.resolution = resolution
@@ -35,7 +42,18 @@ class ScenarioBase():
         self.world_map = world_map
         self.world_weather = world_weather
         self.client_timeout = client_timeout
-        self.init_sleep = init_sleep
+        self.init_timeout = init_timeout
+        if init_sleep is not None:
+            # Fixed sleep replaced by polling, kept as a minimum wait time
+            warnings.warn(
+                "init_sleep is deprecated, use init_timeout instead.",
+                DeprecationWarning, stacklevel=3
+            )
+            self.init_timeout = max(init_timeout, init_sleep)
+        self.headless = headless
+        self.preview_fps = preview_fps
+        self.cache_dir = cache_dir
+        self.tm_port = tm_port
         self._init_simulation()
         self._init_game()
 
@@ -45,24 +63,43 @@ class ScenarioBase():
         self.client.set_timeout(self.client_timeout)
         if self.world_map is not None:
             self.client.load_world(self.world_map)
-        time.sleep(self.init_sleep)
-        self.world = self.client.get_world()
+        self.world = wait_until(
+            self._get_loaded_world, timeout=self.init_timeout,
+            message="Map %s not loaded." % self.world_map
+        )
         if self.world_weather is not None:
             self.world_weather = getattr(
                 carla.WeatherParameters, self.world_weather
             )
             self.world.set_weather(self.world_weather)
+        self.map_cache = get_map_cache(self.client, self.world, self.cache_dir)
         self.init_settings = self.world.get_settings()
         self.world.apply_settings(carla.WorldSettings(
             no_rendering_mode=False,
             synchronous_mode=True,
             fixed_delta_seconds=self.delta_time
         ))
+        # Traffic manager of this server follows the synchronous ticks
+        self.traffic_manager = None
+        if self.tm_port is not None:
+            self.traffic_manager = self.client.get_trafficmanager(self.tm_port)
+            self.traffic_manager.set_synchronous_mode(True)
+
+    def _get_loaded_world(self) -> Any:
+        """Returns world once the requested map is loaded.
+        """
+        world = self.client.get_world()
+        if self.world_map is None or get_map_name(world) == self.world_map.split("/")[-1]:
+            return world
+        return None
 
     def _init_game(self) -> None:
-        """Initializes PyGame window.
+        """Initializes PyGame window, or a no-op stand-in when headless.
         """
-        self.game = Game(resolution=self.resolution)
+        if self.headless:
+            self.game = HeadlessGame(resolution=self.resolution)
+        else:
+            self.game = Game(resolution=self.resolution, preview_fps=self.preview_fps)
 
     def _init_sensors(self, vehicle: Any) -> None:
         """Initializes sensors.
@@ -70,12 +107,11 @@ class ScenarioBase():
         for sensor in self.sensors:
             sensor["options"].update({"image_size_y": f"{self.resolution[0]}"})
             sensor["options"].update({"image_size_x": f"{self.resolution[1]}"})
-        self.active_sensors: List[Sensor] = []
-        for sensor in self.sensors:
-            self.active_sensors.append(Sensor(
-                world=self.world, actor=vehicle,
-                sensor=sensor, delta_time=self.delta_time
-            ))
+        self.active_sensors: List[Sensor] = spawn_sensors(
+            client=self.client, world=self.world, actor=vehicle,
+            sensors=self.sensors, delta_time=self.delta_time,
+            blueprint_library=self.map_cache.get_blueprint_library()
+        )
 
     # === Main Looping Function === #
     def loop(self) -> None:
@@ -88,6 +124,8 @@ class ScenarioBase():
         """Resets simulation settings.
         """
         self.world.apply_settings(self.init_settings)
+        if self.traffic_manager is not None:
+            self.traffic_manager.set_synchronous_mode(False)
         print("Simulation settings reset.")
 
     def _destroy_sensors(self) -> None:
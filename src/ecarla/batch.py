@@ -0,0 +1,428 @@
+import os
+import queue
+import multiprocessing
+
+import carla
+
+from .reader import ScenarioReader
+from .utils.fingerprint import get_inputs, get_stamp, read_stamp, write_stamp
+from .utils.fingerprint import is_current, is_output, complete_stamp, remove_output
+
+from ewiz.core.utils import save_json
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+def get_town_and_weather_names(
+        filename: str, towns_assoc: Dict, weather_assoc: Dict
+    ) -> List:
+    """Gets town and weather names.
+    """
+    world_info = []
+    for town_name in towns_assoc.keys():
+        if town_name in filename:
+            world_info.append(towns_assoc[town_name])
+    for weather_name in weather_assoc.keys():
+        if weather_name in filename:
+            world_info.append(weather_assoc[weather_name])
+    return world_info
+
+
+def index_recordings(
+    data_dir: str,
+    out_dir: str,
+    towns_assoc: Dict[str, str],
+    weather_assoc: Dict[str, str],
+    extension: str = ".log"
+) -> List[Dict[str, Any]]:
+    """Indexes recordings, parsing town and weather from file names.
+    """
+    jobs = []
+    for subdir, dirs, files in os.walk(data_dir):
+        for file in sorted(files):
+            if not file.endswith(extension):
+                continue
+            name = os.path.splitext(os.path.basename(file))[0]
+            job = {
+                "name": name,
+                "record_path": os.path.join(subdir, file),
+                "out_path": os.path.join(out_dir, name),
+                "world_map": None,
+                "world_weather": None,
+                "status": "pending"
+            }
+            world_info = get_town_and_weather_names(file, towns_assoc, weather_assoc)
+            if len(world_info) != 2:
+                job["status"] = "skipped"
+                job["error"] = "Town or weather could not be parsed from file name."
+            else:
+                job["world_map"], job["world_weather"] = world_info
+            jobs.append(job)
+    return jobs
+
+
+def group_recordings(jobs: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Groups recordings left to convert by town, or by their explicit group
+    name, ordered by weather.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for job in jobs:
+        if job["status"] in ["skipped", "done"]:
+            continue
+        groups.setdefault(job.get("group", job["world_map"]), []).append(job)
+    for group_name in groups.keys():
+        groups[group_name].sort(key=lambda job: (job["world_weather"], job["name"]))
+    return dict(sorted(groups.items()))
+
+
+def get_windows_dir(out_path: str) -> str:
+    """Returns directory of time window outputs of a sharded conversion.
+    """
+    return out_path + "_windows"
+
+
+def check_outputs(jobs: List[Dict[str, Any]], reader_kwargs: Dict[str, Any]) -> None:
+    """Marks jobs with outputs stamped from the same inputs as done, removes
+    stale outputs and orphaned partial window outputs of the same recordings,
+    and stamps outputs to redo. Only outputs carrying a stamp written by this
+    tool are ever removed.
+    """
+    resume = reader_kwargs.get("resume", False)
+    out_paths = set()
+    for job in jobs:
+        if job["status"] == "skipped":
+            continue
+        out_path = os.path.abspath(job["out_path"])
+        out_paths.add(out_path)
+        previous = read_stamp(out_path)
+        stamp = get_stamp(job["record_path"], get_inputs(job, reader_kwargs), previous)
+        job["fingerprint"] = stamp["fingerprint"]
+        if is_current(out_path, stamp):
+            print("Up to date:", job["out_path"])
+            # Touched but unchanged recordings are not hashed again
+            if previous.get("record_stat") != stamp["record_stat"]:
+                write_stamp(out_path, stamp, complete=True)
+            job["status"] = "done"
+            job["cached"] = True
+            continue
+        job["status"] = "pending"
+        job.pop("cached", None)
+        # Partial output of the same inputs can continue from its checkpoint
+        if resume and previous is not None and (
+            previous.get("fingerprint") == stamp["fingerprint"]
+        ) and os.path.exists(os.path.join(out_path, "checkpoint.json")):
+            continue
+        if previous is None and is_output(out_path):
+            # Outputs not written by this tool are never removed
+            print("Unstamped output, skipping:", job["out_path"])
+            job["status"] = "skipped"
+            job["error"] = "Output exists without fingerprint, remove it to convert again."
+            continue
+        if previous is not None:
+            remove_output(out_path)
+        write_stamp(out_path, stamp, complete=False)
+
+    # Partial windows of earlier sharded runs of the scheduled recordings,
+    # other directories next to the outputs are never touched
+    for out_path in sorted(out_paths):
+        windows_dir = get_windows_dir(out_path)
+        if not os.path.isdir(windows_dir):
+            continue
+        for dir_name in sorted(os.listdir(windows_dir)):
+            dir_path = os.path.join(windows_dir, dir_name)
+            if dir_path in out_paths or not os.path.isdir(dir_path):
+                continue
+            stamp = read_stamp(dir_path)
+            if stamp is not None and stamp.get("complete") is False:
+                remove_output(dir_path)
+        if not os.listdir(windows_dir):
+            os.rmdir(windows_dir)
+
+
+class BatchScheduler():
+    """Town-grouped batch conversion scheduler.
+    """
+    def __init__(
+        self,
+        client: Any,
+        jobs: List[Dict[str, Any]],
+        manifest_path: str = None,
+        on_update: Callable[[Dict[str, Any]], None] = None,
+        cache_outputs: bool = True,
+        **kwargs
+    ) -> None:
+        self.client = client
+        self.jobs = jobs
+        self.manifest_path = manifest_path
+        self.on_update = on_update
+        self.cache_outputs = cache_outputs
+        self.reader_kwargs = kwargs
+
+    def _save_manifest(self) -> None:
+        """Saves jobs status to manifest.
+        """
+        if self.manifest_path is not None:
+            save_json(self.jobs, self.manifest_path)
+
+    def _update_job(self, job: Dict[str, Any], status: str, error: str = None) -> None:
+        """Updates job status and reports it.
+        """
+        job["status"] = status
+        if error is not None:
+            job["error"] = error
+        elif status == "done":
+            job.pop("error", None)
+        self._save_manifest()
+        if self.on_update is not None:
+            self.on_update(job)
+
+    def _get_map_name(self) -> str:
+        """Returns currently loaded map name.
+        """
+        return os.path.basename(self.client.get_world().get_map().name)
+
+    def _run_job(self, job: Dict[str, Any], load_map: bool) -> None:
+        """Converts single recording.
+        """
+        scenario_reader = ScenarioReader(
+            client=self.client,
+            out_path=job["out_path"],
+            world_map=job["world_map"] if load_map else None,
+            world_weather=job["world_weather"],
+            record_path=job["record_path"],
+            window=job.get("window"),
+            **self.reader_kwargs
+        )
+        scenario_reader.loop()
+        # Reader loop reports its own errors, only complete outputs are reused
+        if not scenario_reader.completed:
+            raise RuntimeError("Conversion did not complete.")
+        if job.get("fingerprint") is not None:
+            complete_stamp(job["out_path"], job["fingerprint"])
+
+    # === User Functions === #
+    def is_responsive(self) -> bool:
+        """Checks if the server still answers requests.
+        """
+        try:
+            self.client.get_server_version()
+            return True
+        except Exception:
+            return False
+
+    def run_group(self, world_map: str, jobs: List[Dict[str, Any]]) -> None:
+        """Runs jobs of a single town, loading its map at most once.
+        """
+        try:
+            load_map = self._get_map_name() != world_map
+        except Exception:
+            load_map = True
+        for job in jobs:
+            print("Processing:", job["record_path"] + "...")
+            self._update_job(job, "running")
+            try:
+                self._run_job(job, load_map)
+                # Reader loop reports its own errors, check the server survived
+                if not self.is_responsive():
+                    raise RuntimeError("Server stopped responding.")
+                self._update_job(job, "done")
+                load_map = False
+            except Exception as error:
+                print(error)
+                self._update_job(job, "failed", str(error))
+                # Leave remaining jobs pending when the server is gone
+                if not self.is_responsive():
+                    break
+                # Reload map after failures
+                load_map = True
+
+    # === Main Function === #
+    def run(self) -> List[Dict[str, Any]]:
+        """Runs all jobs, loading each map once per group.
+        """
+        if self.cache_outputs:
+            check_outputs(self.jobs, self.reader_kwargs)
+        self._save_manifest()
+        for group_name, jobs in group_recordings(self.jobs).items():
+            self.run_group(jobs[0]["world_map"], jobs)
+        return self.jobs
+
+
+def _run_pool_worker(
+    endpoint: Tuple[str, int, int],
+    work_queue: multiprocessing.Queue,
+    result_queue: multiprocessing.Queue,
+    client_timeout: float,
+    cache_outputs: bool,
+    reader_kwargs: Dict[str, Any]
+) -> None:
+    """Runs town groups on a single server until told to stop or the server
+    stops responding.
+    """
+    host, port, tm_port = endpoint
+    client = carla.Client(host, port)
+    client.set_timeout(client_timeout)
+    # Servers sharing a host need their own traffic manager port
+    batch_scheduler = BatchScheduler(
+        client=client, jobs=[],
+        on_update=lambda job: result_queue.put(("update", endpoint, dict(job))),
+        cache_outputs=cache_outputs,
+        **dict(reader_kwargs, tm_port=tm_port)
+    )
+    while True:
+        group = work_queue.get()
+        if group is None:
+            break
+        group_name, jobs = group
+        result_queue.put(("start", endpoint, jobs))
+        batch_scheduler.run_group(jobs[0]["world_map"], jobs)
+        unfinished = [job for job in jobs if job["status"] != "done"]
+        if unfinished and not batch_scheduler.is_responsive():
+            result_queue.put(("retry", endpoint, unfinished))
+            break
+        result_queue.put(("group", endpoint, None))
+    result_queue.put(("exit", endpoint, None))
+
+
+class BatchPool():
+    """Multi-server batch conversion pool, one worker process per server.
+    """
+    def __init__(
+        self,
+        endpoints: List[Tuple[str, int, int]],
+        jobs: List[Dict[str, Any]],
+        manifest_path: str = None,
+        max_retries: int = 2,
+        client_timeout: float = 10.0,
+        cache_outputs: bool = True,
+        **kwargs
+    ) -> None:
+        self.endpoints = [tuple(endpoint) for endpoint in endpoints]
+        self.jobs = jobs
+        self.manifest_path = manifest_path
+        self.max_retries = max_retries
+        self.client_timeout = client_timeout
+        self.cache_outputs = cache_outputs
+        self.reader_kwargs = kwargs
+        self.reader_kwargs.setdefault("client_timeout", client_timeout)
+
+    def _save_manifest(self) -> None:
+        """Saves jobs status to manifest.
+        """
+        if self.manifest_path is not None:
+            save_json(self.jobs, self.manifest_path)
+
+    def _print_progress(self) -> None:
+        """Prints aggregated progress.
+        """
+        counts: Dict[str, int] = {}
+        for job in self.jobs:
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        print("Batch progress:", counts)
+
+    def _retry_jobs(
+        self,
+        jobs: List[Dict[str, Any]],
+        work_queue: multiprocessing.Queue
+    ) -> int:
+        """Requeues jobs of a failed server, returns number of queued groups.
+        """
+        retry_jobs = []
+        for job in jobs:
+            job = self.jobs_by_name[job["name"]]
+            if job["status"] == "done":
+                continue
+            # Only attempted jobs count as retries
+            if job["status"] != "pending":
+                job["retries"] = job.get("retries", 0) + 1
+            if job.get("retries", 0) > self.max_retries:
+                job["status"] = "failed"
+            else:
+                job["status"] = "pending"
+                retry_jobs.append(job)
+        groups = group_recordings(retry_jobs)
+        for group_name, group_jobs in groups.items():
+            work_queue.put((group_name, group_jobs))
+        return len(groups)
+
+    # === Main Function === #
+    def run(self) -> List[Dict[str, Any]]:
+        """Distributes town groups across servers and aggregates progress.
+        """
+        self.jobs_by_name = {job["name"]: job for job in self.jobs}
+        if self.cache_outputs:
+            check_outputs(self.jobs, self.reader_kwargs)
+        self._save_manifest()
+        # Forked workers inherit reader arguments without pickling them
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context()
+        work_queue = context.Queue()
+        result_queue = context.Queue()
+        groups = group_recordings(self.jobs)
+        for group_name, jobs in groups.items():
+            work_queue.put((group_name, jobs))
+        pending_groups = len(groups)
+
+        # One worker process per server
+        workers = {}
+        for endpoint in self.endpoints:
+            workers[endpoint] = context.Process(
+                target=_run_pool_worker,
+                args=(
+                    endpoint, work_queue, result_queue,
+                    self.client_timeout, self.cache_outputs, self.reader_kwargs
+                ),
+                daemon=True
+            )
+            workers[endpoint].start()
+        active_workers = set(workers.keys())
+        worker_jobs: Dict[Tuple[str, int, int], List[Dict[str, Any]]] = {}
+
+        # Aggregate worker results
+        stop_sent = False
+        while active_workers:
+            if pending_groups == 0 and not stop_sent:
+                for _ in range(len(active_workers)):
+                    work_queue.put(None)
+                stop_sent = True
+            try:
+                message, endpoint, payload = result_queue.get(timeout=self.client_timeout)
+            except queue.Empty:
+                # Requeue work of worker processes that died silently
+                for endpoint in list(active_workers):
+                    if not workers[endpoint].is_alive():
+                        print("Worker died:", "%s:%d" % endpoint[:2])
+                        active_workers.discard(endpoint)
+                        if worker_jobs.get(endpoint):
+                            pending_groups += self._retry_jobs(
+                                worker_jobs.pop(endpoint), work_queue
+                            ) - 1
+                continue
+            if message == "start":
+                worker_jobs[endpoint] = payload
+            elif message == "update":
+                self.jobs_by_name[payload["name"]].update(payload)
+                self._print_progress()
+            elif message == "group":
+                worker_jobs.pop(endpoint, None)
+                pending_groups -= 1
+            elif message == "retry":
+                print("Server not responding:", "%s:%d" % endpoint[:2])
+                worker_jobs.pop(endpoint, None)
+                pending_groups += self._retry_jobs(payload, work_queue) - 1
+            elif message == "exit":
+                active_workers.discard(endpoint)
+            self._save_manifest()
+        for worker in workers.values():
+            worker.join()
+
+        # Jobs left without any responsive server
+        for job in self.jobs:
+            if job["status"] in ["pending", "running"]:
+                job["status"] = "failed"
+                job["error"] = "No responsive server left."
+        self._save_manifest()
+        self._print_progress()
+        return self.jobs
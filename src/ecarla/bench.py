@@ -0,0 +1,390 @@
+import os
+import sys
+import time
+import shutil
+import platform
+import tempfile
+import statistics
+
+import numpy as np
+
+from . import standin
+from .utils import extract
+from .utils.extract import EVENT_DTYPE, DVS_TIME_DIVISOR
+from .utils.writers import WriterEventPackets, WriterGrayResumable, WriterFlowResumable
+from .utils.buffer import FrameBuffer
+
+from ewiz.core.utils import save_json, read_json
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+# Sensor resolutions as (height, width)
+BENCH_RESOLUTIONS = [(260, 346), (720, 1080)]
+# Events per pixel within one packet, sparse to saturated
+EVENT_DENSITIES = {"sparse": 0.001, "medium": 0.02, "dense": 0.2, "saturated": 2.0}
+# Relative slowdown flagged as a regression
+REGRESSION_THRESHOLD = 0.1
+
+
+# === Synthetic Data === #
+def _create_events(
+    resolution: Tuple[int, int],
+    density: float,
+    start_time: float,
+    delta_time: float,
+    seed: int = 0
+) -> standin.SensorData:
+    """Returns DVS measurement with uniformly spread events.
+    """
+    height, width = resolution
+    rng = np.random.default_rng(seed)
+    num_events = max(int(density*height*width), 1)
+    events = np.empty(num_events, dtype=EVENT_DTYPE)
+    events["x"] = rng.integers(0, width, num_events)
+    events["y"] = rng.integers(0, height, num_events)
+    events["pol"] = rng.integers(0, 2, num_events).astype(bool)
+    scale = 1e6*DVS_TIME_DIVISOR
+    events["t"] = np.sort(rng.integers(
+        int(start_time*scale), int((start_time + delta_time)*scale), num_events
+    ))
+    return standin.SensorData(
+        frame=1, timestamp=start_time + delta_time, transform=standin.Transform(),
+        raw_data=events, width=width, height=height
+    )
+
+
+def _create_image(
+    resolution: Tuple[int, int],
+    type_id: str,
+    seed: int = 0
+) -> standin.SensorData:
+    """Returns random BGRA or optical flow measurement.
+    """
+    height, width = resolution
+    rng = np.random.default_rng(seed)
+    if type_id == "sensor.camera.optical_flow":
+        image = rng.uniform(-0.05, 0.05, (height, width, 2)).astype(np.float32)
+    else:
+        image = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    return standin.SensorData(
+        frame=1, timestamp=1.0, transform=standin.Transform(),
+        raw_data=image, width=width, height=height
+    )
+
+
+# === Timing === #
+def time_case(
+    func: Callable[[], Any],
+    repeat: int = 5,
+    min_time: float = 0.2
+) -> Dict[str, float]:
+    """Times function calls, batching calls so each round lasts at least
+    min_time seconds.
+    """
+    func()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        duration = time.perf_counter() - start
+        if duration >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if duration <= 0.0 else max(2, int(min_time/duration) + 1)
+    rounds = [duration/number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start)/number)
+    return {
+        "median_ms": 1e3*statistics.median(rounds),
+        "min_ms": 1e3*min(rounds),
+        "stdev_ms": 1e3*statistics.pstdev(rounds),
+        "calls": number*repeat
+    }
+
+
+class BenchSuite():
+    """Micro-benchmarks of the per-tick hot loop on synthetic sensor data:
+    extraction, synchronization and writing.
+    """
+    def __init__(
+        self,
+        resolutions: List[Tuple[int, int]] = None,
+        densities: Dict[str, float] = None,
+        repeat: int = 5,
+        min_time: float = 0.2,
+        pattern: str = None
+    ) -> None:
+        self.resolutions = BENCH_RESOLUTIONS if resolutions is None else resolutions
+        self.densities = EVENT_DENSITIES if densities is None else densities
+        self.repeat = repeat
+        self.min_time = min_time
+        self.pattern = pattern
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def _run_case(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        items: int = None,
+        cleanup: Callable[[], None] = None
+    ) -> None:
+        """Times single case if it matches the pattern.
+        """
+        if self.pattern is not None and self.pattern not in name:
+            if cleanup is not None:
+                cleanup()
+            return
+        try:
+            result = time_case(func, repeat=self.repeat, min_time=self.min_time)
+        finally:
+            if cleanup is not None:
+                cleanup()
+        if items is not None:
+            result["items"] = items
+            result["items_per_s"] = items/max(result["median_ms"]*1e-3, 1e-12)
+        self.results[name] = result
+        print("%-48s %10.4f ms" % (name, result["median_ms"]))
+
+    @staticmethod
+    def _get_res_name(resolution: Tuple[int, int]) -> str:
+        return "%dx%d" % resolution
+
+    # === Extraction === #
+    def _bench_extract(self) -> None:
+        """Benchmarks sensor data extraction.
+        """
+        for resolution in self.resolutions:
+            res_name = self._get_res_name(resolution)
+            for density_name, density in self.densities.items():
+                data = _create_events(resolution, density, 1.0, 0.01)
+                num_events = len(data.raw_data)//EVENT_DTYPE.itemsize
+                # Packet case keeps the array time settings, native time is separate
+                for mode, options in [
+                    ("array", {}), ("packet", {"packet": True}),
+                    ("packet_native", {"packet": True, "native_time": True})
+                ]:
+                    self._run_case(
+                        "extract.events.%s.%s.%s" % (mode, res_name, density_name),
+                        lambda: extract.extract_events(data, sim_time=1.0, **options),
+                        items=num_events
+                    )
+            rgb = _create_image(resolution, "sensor.camera.rgb")
+            flow = _create_image(resolution, "sensor.camera.optical_flow")
+            self._run_case(
+                "extract.rgb.%s" % res_name,
+                lambda: extract.extract_rgb(rgb, sim_time=1.0)
+            )
+            self._run_case(
+                "extract.gray.float.%s" % res_name,
+                lambda: extract.extract_gray(rgb, sim_time=1.0)
+            )
+            self._run_case(
+                "extract.gray.uint8.%s" % res_name,
+                lambda: extract.extract_gray(rgb, sim_time=1.0, uint8=True)
+            )
+            self._run_case(
+                "extract.flow.float64.%s" % res_name,
+                lambda: extract.extract_flow(flow, sim_time=1.0)
+            )
+            self._run_case(
+                "extract.flow.float32.%s" % res_name,
+                lambda: extract.extract_flow(flow, sim_time=1.0, dtype=np.float32)
+            )
+
+    # === Synchronization === #
+    def _bench_sync(self) -> None:
+        """Benchmarks sensor synchronization on the local stand-in.
+        """
+        # Simulation modules need the stand-in registered as carla
+        if sys.modules.get("carla") is not standin:
+            print("Skipping sync benchmarks, call standin.install() first.")
+            return
+        from .utils.sensor import Sensor, spawn_sensors
+        from .utils.sync import SensorSync
+
+        for resolution in self.resolutions:
+            res_name = self._get_res_name(resolution)
+            client = standin.Client("bench", 0)
+            world = client.load_world("Town02")
+            world.apply_settings(standin.WorldSettings(
+                synchronous_mode=True, fixed_delta_seconds=0.01
+            ))
+            vehicle = world.spawn_actor(
+                world.get_blueprint_library().find("vehicle.tesla.cybertruck"),
+                standin.Transform()
+            )
+            options = {"image_size_y": str(resolution[0]), "image_size_x": str(resolution[1])}
+            sensors = spawn_sensors(client=client, world=world, actor=vehicle, sensors=[
+                {
+                    "name": name, "type": type_id, "transform": standin.Transform(),
+                    "options": {**options, "sensor_tick": sensor_tick}, "converter": None
+                }
+                for name, type_id, sensor_tick in [
+                    ("gray", "sensor.camera.rgb", "0.04"),
+                    ("events", "sensor.camera.dvs", "0.0"),
+                    ("flow", "sensor.camera.optical_flow", "0.04")
+                ]
+            ], delta_time=0.01)
+            with SensorSync(
+                world=world, sensors=sensors, start_time=0.0, delta_time=0.01
+            ) as sensor_sync:
+                self._run_case(
+                    "sync.tick.%s" % res_name, lambda: sensor_sync.tick(timeout=2.0)
+                )
+            for sensor in sensors:
+                sensor.get_obj().destroy()
+            vehicle.destroy()
+
+            # Buffered frame read, as done for every due sensor
+            sensor = Sensor(
+                world=world, actor=None, delta_time=0.01, spawn=False, sensor={
+                    "name": "gray", "type": "sensor.camera.rgb", "options": options,
+                    "transform": standin.Transform(), "converter": None
+                }
+            )
+            data = _create_image(resolution, "sensor.camera.rgb")
+            sensor_buffer = FrameBuffer()
+
+            def read_data() -> Any:
+                sensor_buffer.put(data)
+                return sensor.read_data(
+                    world_frame=data.frame, sensor_buffer=sensor_buffer,
+                    elapsed_time=data.timestamp, timeout=0.0
+                )
+
+            self._run_case("sync.read_data.%s" % res_name, read_data)
+
+    # === Writing === #
+    def _bench_write(self) -> None:
+        """Benchmarks writers appending to temporary files.
+        """
+        for resolution in self.resolutions:
+            res_name = self._get_res_name(resolution)
+            for density_name, density in self.densities.items():
+                data = _create_events(resolution, density, 1.0, 0.01)
+                packet = extract.extract_events(data, sim_time=1.0, packet=True)[0]
+                temp_dir = tempfile.mkdtemp(prefix="ecarla_bench_")
+                writer = WriterEventPackets(temp_dir)
+
+                def write_events() -> None:
+                    writer.write(packet)
+
+                def close_events() -> None:
+                    writer.events_file.close()
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+
+                self._run_case(
+                    "write.events.%s.%s" % (res_name, density_name),
+                    write_events, items=len(packet), cleanup=close_events
+                )
+
+            rgb = _create_image(resolution, "sensor.camera.rgb")
+            flow = _create_image(resolution, "sensor.camera.optical_flow")
+            gray_image = extract.extract_gray(rgb, sim_time=1.0, uint8=True)[0]
+            flow_image = extract.extract_flow(flow, sim_time=1.0)[0]
+            temp_dir = tempfile.mkdtemp(prefix="ecarla_bench_")
+            gray_writer = WriterGrayResumable(temp_dir)
+            flow_writer = WriterFlowResumable(temp_dir)
+            counter = {"gray": 0, "flow": 0}
+
+            def write_gray() -> None:
+                counter["gray"] += 1
+                gray_writer.write(gray_image=gray_image, time=counter["gray"]*40000)
+
+            def write_flow() -> None:
+                counter["flow"] += 1
+                flow_writer.write(flow=flow_image, time=counter["flow"]*40000)
+
+            self._run_case("write.gray.%s" % res_name, write_gray)
+            self._run_case("write.flow.%s" % res_name, write_flow)
+            gray_writer.gray_file.close()
+            flow_writer.flow_file.close()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    # === User Functions === #
+    def run(self) -> Dict[str, Any]:
+        """Runs all benchmarks and returns results with environment info.
+        """
+        self.results = {}
+        print("# === Extraction === #")
+        self._bench_extract()
+        print("# === Synchronization === #")
+        self._bench_sync()
+        print("# === Writing === #")
+        self._bench_write()
+        return {
+            "meta": {
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "host": platform.node(),
+                "machine": platform.machine(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "cpus": os.cpu_count()
+            },
+            "results": self.results
+        }
+
+
+def save_results(results: Dict[str, Any], file_path: str) -> None:
+    """Saves benchmark results as JSON baseline.
+    """
+    save_json(results, file_path)
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    results: Dict[str, Any],
+    threshold: float = REGRESSION_THRESHOLD,
+    pattern: str = None
+) -> List[Dict[str, Any]]:
+    """Compares median times against a baseline, flagging changes beyond the
+    relative threshold. Cases filtered out by pattern are not reported missing.
+    """
+    rows = []
+    base_results = baseline["results"]
+    for name, result in results["results"].items():
+        row = {"name": name, "current_ms": result["median_ms"], "status": "new"}
+        if name in base_results:
+            row["baseline_ms"] = base_results[name]["median_ms"]
+            row["ratio"] = row["current_ms"]/max(row["baseline_ms"], 1e-12)
+            if row["ratio"] > 1.0 + threshold:
+                row["status"] = "regression"
+            elif row["ratio"] < 1.0/(1.0 + threshold):
+                row["status"] = "improvement"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    for name in base_results.keys():
+        if name not in results["results"] and (pattern is None or pattern in name):
+            rows.append({
+                "name": name, "baseline_ms": base_results[name]["median_ms"],
+                "status": "missing"
+            })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> int:
+    """Prints comparison table, returns number of regressions.
+    """
+    print("%-48s %12s %12s %8s  %s" % ("Case", "Base (ms)", "Now (ms)", "Ratio", "Status"))
+    for row in rows:
+        print("%-48s %12s %12s %8s  %s" % (
+            row["name"],
+            "%.4f" % row["baseline_ms"] if "baseline_ms" in row else "-",
+            "%.4f" % row["current_ms"] if "current_ms" in row else "-",
+            "%.2fx" % row["ratio"] if "ratio" in row else "-",
+            row["status"].upper() if row["status"] == "regression" else row["status"]
+        ))
+    num_regressions = sum(row["status"] == "regression" for row in rows)
+    print("# === %d Regressions === #" % num_regressions)
+    return num_regressions
+
+
+def load_results(file_path: str) -> Dict[str, Any]:
+    """Loads benchmark results.
+    """
+    return read_json(file_path)
@@ -0,0 +1,134 @@
+import os
+import multiprocessing
+
+from .utils import extract
+from .utils.spool import SpoolReader
+from .utils.writers import WriterEventPackets, WriterGrayResumable, WriterFlowResumable, EventsBuffer
+from .utils.index import IndexBuilder
+from .utils.profiler import Profiler
+
+from ewiz.core.utils import create_dir, save_json
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+# Spool shared with forked workers
+_spool_reader: SpoolReader = None
+_extract_options: Dict[str, Dict[str, Any]] = {}
+
+
+def _init_worker(spool_dir: str, extract_options: Dict[str, Dict[str, Any]]) -> None:
+    """Maps spool in worker process.
+    """
+    global _spool_reader, _extract_options
+    _spool_reader = SpoolReader(spool_dir)
+    _extract_options = extract_options
+
+
+def _extract_record(task: Tuple[str, int]) -> Tuple[Any, Any]:
+    """Extracts single spooled record, dropping its preview.
+    """
+    name, index = task
+    sensor_data = getattr(extract, "extract_" + name)(
+        _spool_reader.get_data(name, index),
+        sim_time=_spool_reader.get_sim_time(name, index),
+        **_extract_options.get(name, {})
+    )
+    return sensor_data[0], sensor_data[1]
+
+
+class SpoolConverter():
+    """Offline converter of raw sensor spools to the eWiz format, extracting
+    records on a process pool.
+    """
+    def __init__(
+        self,
+        spool_dir: str,
+        out_path: str,
+        extract_options: Dict[str, Dict[str, Any]] = None,
+        num_workers: int = None,
+        chunk_size: int = 16,
+        events_chunk_size: int = 1000000,
+        events_chunk_time: float = 1.0,
+        summary_period: float = 5.0
+    ) -> None:
+        self.spool_dir = spool_dir
+        self.out_path = out_path
+        self.extract_options = {} if extract_options is None else extract_options
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self.events_chunk_size = events_chunk_size
+        self.events_chunk_time = events_chunk_time
+        self.profiler = Profiler(summary_period=summary_period)
+        self.spool_reader = SpoolReader(self.spool_dir)
+        self._init_writers()
+
+    def _init_writers(self) -> None:
+        """Initializes writers and incremental indices.
+        """
+        self.out_path = create_dir(self.out_path)
+        save_json(self.spool_reader.props, os.path.join(self.out_path, "props.json"))
+        self.events_writer = WriterEventPackets(self.out_path)
+        self.gray_writer = WriterGrayResumable(self.out_path)
+        self.flow_writer = WriterFlowResumable(self.out_path)
+        self.index_builder = IndexBuilder(
+            events_writer=self.events_writer,
+            frame_writers={
+                "gray": (self.gray_writer, self.gray_writer.gray_file),
+                "flow": (self.flow_writer, self.flow_writer.flow_file)
+            }
+        )
+        self.events_buffer = EventsBuffer(
+            self.events_writer,
+            max_events=self.events_chunk_size,
+            max_time=int(round(self.events_chunk_time*1e6)),
+            on_write=self.index_builder.add_events
+        )
+
+    def _write_sensor(self, sensor_name: str, sensor_data: Tuple[Any, Any]) -> None:
+        """Writes single sensor data with its writer.
+        """
+        if sensor_name == "events":
+            self.events_buffer.write(sensor_data[0])
+            return
+        elif sensor_name == "gray":
+            self.gray_writer.write(gray_image=sensor_data[0], time=sensor_data[1])
+        elif sensor_name == "flow":
+            self.flow_writer.write(flow=sensor_data[0], time=sensor_data[1])
+        else:
+            # TODO: Add error message
+            raise NotImplementedError
+        self.index_builder.add_frame(sensor_name, sensor_data[1])
+
+    # === Main Function === #
+    def run(self) -> None:
+        """Extracts spooled records in parallel and writes them in order.
+        """
+        # Forked workers map the spool without pickling it
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context()
+        with context.Pool(
+            processes=self.num_workers, initializer=_init_worker,
+            initargs=(self.spool_dir, self.extract_options)
+        ) as pool:
+            for sensor_name in self.spool_reader.sensors.keys():
+                print("# === Converting", sensor_name, "=== #")
+                num_records = self.spool_reader.get_size(sensor_name)
+                # Ordered results, extracted ahead of the writer
+                results = pool.imap(
+                    _extract_record,
+                    ((sensor_name, i) for i in range(num_records)),
+                    chunksize=self.chunk_size
+                )
+                for i, sensor_data in enumerate(results):
+                    with self.profiler.measure("write." + sensor_name):
+                        self._write_sensor(sensor_name, sensor_data)
+                    self.profiler.end_tick(
+                        frame=i, sim_time=self.spool_reader.get_sim_time(sensor_name, i)
+                    )
+        self.events_buffer.flush()
+        print("# === Mapping Data === #")
+        self.index_builder.finalize()
+        self.profiler.close()
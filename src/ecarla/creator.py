@@ -1,7 +1,8 @@
-import time
+import random
 
 import carla
 import pygame
+import numpy as np
 
 from .base import ScenarioBase
 from .utils.game import Game
@@ -9,11 +10,11 @@ from .utils.sensor import Sensor
 from .utils.sync import SensorSync
 
 from .utils.spawn import VehicleSpawner, TrafficSpawner
-from .utils.control import ManualControl
+from .utils.control import ManualControl, AutopilotControl, RouteControl
 
 from .utils import extract
-
-from datetime import timedelta
+from .utils.profiler import Profiler
+from .utils.ready import wait_until
 
 from typing import Any, Dict, List, Tuple, Callable
 
@@ -33,17 +34,35 @@ class ScenarioCreator(ScenarioBase):
         record_delta_time: float = 60.0,
         num_vehicles: int = None,
         num_peds: int = None,
+        timeline_path: str = None,
+        summary_period: float = 5.0,
+        driver: str = "manual",
+        route: List[Any] = None,
+        target_speed: float = 30.0,
+        tm_port: int = 8000,
+        seed: int = None,
         **kwargs
     ) -> None:
         super().__init__(
             client=client, resolution=resolution, out_path=out_path,
-            start_time=start_time, delta_time=delta_time, **kwargs
+            start_time=start_time, delta_time=delta_time, tm_port=tm_port, **kwargs
         )
         self.vehicle_type = vehicle_type
         self.record_start_time = record_start_time
         self.record_delta_time = record_delta_time
         self.num_vehicles = num_vehicles
         self.num_peds = num_peds
+        self.profiler = Profiler(timeline_path=timeline_path, summary_period=summary_period)
+        self.driver = driver
+        self.route = route
+        self.target_speed = target_speed
+        self.seed = seed
+        if driver not in ["manual", "autopilot", "route"]:
+            raise ValueError("Driver should be manual, autopilot or route.")
+        if driver == "route" and not route:
+            raise ValueError("Route driver needs a list of locations.")
+        if driver == "manual" and self.headless:
+            raise ValueError("Manual driver needs a window.")
         self._init_vehicles()
         self._init_sensors(vehicle=self.active_vehicle)
         self._init_control(vehicle=self.active_vehicle)
@@ -51,21 +70,44 @@ class ScenarioCreator(ScenarioBase):
     def _init_vehicles(self) -> None:
         """Initializes scenario creator.
         """
-        self.vehicle_spawner = VehicleSpawner(client=self.client, world=self.world)
+        # Same spawns for the same seed
+        if self.seed is not None:
+            random.seed(self.seed)
+            np.random.seed(self.seed)
+        self.vehicle_spawner = VehicleSpawner(
+            client=self.client, world=self.world, map_cache=self.map_cache
+        )
         self.vehicle_spawner.spawn_vehicles(num_vehicles=1, vehicle_type=self.vehicle_type)
         self.traffic_spawner = TrafficSpawner(
             client=self.client,
             world=self.world,
             num_vehicles=self.num_vehicles,
-            num_peds=self.num_peds
+            num_peds=self.num_peds,
+            map_cache=self.map_cache,
+            tm_port=self.tm_port,
+            seed=self.seed
         )
         self.active_vehicle = self.vehicle_spawner.get_vehicles()[0]
-        time.sleep(10)
+        wait_until(
+            lambda: self.world.get_actor(self.active_vehicle.id) is not None,
+            timeout=self.init_timeout, message="Vehicle not spawned."
+        )
 
     def _init_control(self, vehicle: Any) -> None:
-        """Initializes manual control.
+        """Initializes manual, autopilot or scripted route control.
         """
-        self.control = ManualControl(world=self.world, actor=vehicle)
+        if self.driver == "autopilot":
+            self.control = AutopilotControl(
+                world=self.world, actor=vehicle,
+                traffic_manager=self.traffic_spawner.traffic_manager
+            )
+        elif self.driver == "route":
+            self.control = RouteControl(
+                world=self.world, actor=vehicle, route=self.route,
+                target_speed=self.target_speed
+            )
+        else:
+            self.control = ManualControl(world=self.world, actor=vehicle)
 
     def _render(self, data: Dict[str, Any]) -> None:
         """Renders RGB image in window.
@@ -83,20 +125,25 @@ class ScenarioCreator(ScenarioBase):
         # Flip display
         self.game.flip()
 
+    def _get_status(self) -> Dict[str, Any]:
+        """Returns recording status.
+        """
+        return {"Recording": self.record_flag and not self.end_record_flag}
+
     # === Main Looping Function === #
     def loop(self) -> None:
         """Loops synchronous simulation.
         """
         try:
             self.sim_time = 0.0
-            self.real_time = time.time()
+            self.record_flag = False
+            self.end_record_flag = False
             # Run in synchronous mode
             with SensorSync(
                 world=self.world, sensors=self.active_sensors,
-                start_time=self.start_time, delta_time=self.delta_time
+                start_time=self.start_time, delta_time=self.delta_time,
+                profiler=self.profiler, init_timeout=self.init_timeout
             ) as sensor_sync:
-                self.record_flag = False
-                self.end_record_flag = False
                 # Main loop
                 while True:
                     # Start recording
@@ -116,23 +163,32 @@ class ScenarioCreator(ScenarioBase):
                     self.game.tick_clock()
                     # Parse data
                     data = sensor_sync.tick(timeout=2.0)
+                    self.sim_time = sensor_sync.get_sim_time()
                     # Render data
-                    self._render(data=data)
-                    # Vehicle control
-                    self.game.tick_clock_busy_loop(fps=60)
+                    if self.game.should_render():
+                        with self.profiler.measure("render"):
+                            self._render(data=data)
+                    # Vehicle control, only a human driver needs real time
+                    if self.driver == "manual":
+                        with self.profiler.measure("clock"):
+                            self.game.tick_clock_busy_loop(fps=60)
                     game_clock = self.game.get_clock()
-                    if self.control.parse_control(clock=game_clock):
+                    with self.profiler.measure("control"):
+                        if self.control.parse_control(clock=game_clock):
+                            return
+                    # Scripted runs end with the recording
+                    if self.driver != "manual" and self.end_record_flag:
                         return
 
                     # Print status
-                    print("=====", "Frame ID:", data["world"], "=====")
-                    print("RGB Data:", data["rgb"] is not None)
-                    print("Sim Time:", str(timedelta(seconds=self.sim_time)))
-                    print("Real Time:", str(timedelta(seconds=time.time() - self.real_time)))
-
-                    # Update simulation time
-                    self.sim_time += self.delta_time
+                    self.profiler.end_tick(
+                        frame=data["world"], sim_time=self.sim_time,
+                        info=self._get_status
+                    )
         finally:
+            if self.record_flag and not self.end_record_flag:
+                self.client.stop_recorder()
+            self.profiler.close()
             self.game.quit()
             self._reset_settings()
             self.vehicle_spawner.destroy_vehicles()
@@ -1,5 +1,5 @@
 import os
-import time
+import math
 
 import carla
 import pygame
@@ -7,17 +7,22 @@ import pygame
 from .base import ScenarioBase
 from .utils.game import Game
 from .utils.sensor import Sensor
-from .utils.sync import SensorSync
+from .utils.sync import SensorSync, get_capture_ticks
 
 from .utils.spawn import VehicleSpawner
 from .utils.control import ManualControl
 
 from .utils import extract
+from .utils.writers import WriterEventPackets, WriterGrayResumable, WriterFlowResumable, EventsBuffer
+from .utils.pipeline import SensorPipeline
+from .utils.index import IndexBuilder
+from .utils.spool import SpoolWriter
+from .utils.profiler import Profiler
+from .utils.ready import wait_until
 
-from ewiz.core.utils import create_dir, save_json
-from ewiz.data.writers import WriterEvents, WriterGray, WriterFlow
+from ewiz.core.utils import create_dir, save_json, read_json
 
-from datetime import timedelta
+from functools import partial
 
 from typing import Any, Dict, List, Tuple, Callable
 
@@ -34,6 +39,19 @@ class ScenarioReader(ScenarioBase):
         delta_time: float = 0.1,
         record_path: str = None,
         record_delta_time: float = 60.0,
+        extract_options: Dict[str, Dict[str, Any]] = None,
+        pipelined: bool = False,
+        pipeline_size: int = 8,
+        timeline_path: str = None,
+        summary_period: float = 5.0,
+        checkpoint_period: float = None,
+        resume: bool = False,
+        window: Tuple[float, float] = None,
+        warmup_margin: float = 1.0,
+        map_data: bool = True,
+        events_chunk_size: int = 1000000,
+        events_chunk_time: float = 1.0,
+        spool_dir: str = None,
         **kwargs
     ) -> None:
         super().__init__(
@@ -42,14 +60,31 @@ class ScenarioReader(ScenarioBase):
         )
         self.record_path = record_path
         self.record_delta_time = record_delta_time
+        self.extract_options = {} if extract_options is None else extract_options
+        self.pipelined = pipelined
+        self.pipeline_size = pipeline_size
+        self.pipeline = None
         # TODO: Change hard-coded values
         self.out_path = create_dir(self.out_path)
+        self.profiler = Profiler(timeline_path=timeline_path, summary_period=summary_period)
         self.images = {"events": None, "gray": None, "flow": None}
-        self._save_props()
+        self.checkpoint_period = checkpoint_period
+        self.window = window
+        self.warmup_margin = warmup_margin
+        self.map_data = map_data
+        self.events_chunk_size = events_chunk_size
+        self.events_chunk_time = events_chunk_time
+        self.spool_dir = spool_dir
+        if spool_dir is not None and (checkpoint_period is not None or resume):
+            raise ValueError("Checkpoints are not supported while spooling.")
+        if spool_dir is None:
+            self._save_props()
         self._init_writers()
+        self._init_spool()
+        self._init_checkpoint(resume)
+        self._init_window()
         self._read_recording()
         self._init_sensors(vehicle=self.active_actor)
-        time.sleep(10)
 
     # TODO: Check format requirements
     def _save_props(self) -> None:
@@ -65,21 +100,157 @@ class ScenarioReader(ScenarioBase):
     def _init_writers(self) -> None:
         """Initializes writers.
         """
-        self.events_writer = WriterEvents(self.out_path)
-        self.gray_writer = WriterGray(self.out_path)
-        self.flow_writer = WriterFlow(self.out_path)
+        self.index_builder = None
+        self.events_buffer = None
+        if self.spool_dir is not None:
+            # Spool converter writes the dataset later
+            self.events_writer = self.gray_writer = self.flow_writer = None
+            return
+        self.events_writer = WriterEventPackets(self.out_path)
+        self.gray_writer = WriterGrayResumable(self.out_path)
+        self.flow_writer = WriterFlowResumable(self.out_path)
+        if self.map_data:
+            self.index_builder = IndexBuilder(
+                events_writer=self.events_writer,
+                frame_writers={
+                    "gray": (self.gray_writer, self.gray_writer.gray_file),
+                    "flow": (self.flow_writer, self.flow_writer.flow_file)
+                }
+            )
+        # Indices follow events as they reach the file
+        self.events_buffer = EventsBuffer(
+            self.events_writer,
+            max_events=self.events_chunk_size,
+            max_time=int(round(self.events_chunk_time*1e6)),
+            on_write=None if self.index_builder is None else self.index_builder.add_events
+        )
+
+    def _init_spool(self) -> None:
+        """Initializes raw sensor spool for offline conversion.
+        """
+        self.spool = None
+        if self.spool_dir is not None:
+            self.spool = SpoolWriter(
+                spool_dir=self.spool_dir,
+                sensors={sensor["name"]: sensor["type"] for sensor in self.sensors},
+                props={"sensor_size": self.resolution}
+            )
+
+    def _spool_data(self, data: Dict[str, Any]) -> None:
+        """Appends raw sensor data to the spool.
+        """
+        with self.profiler.measure("spool"):
+            for sensor_name in data.keys():
+                if data[sensor_name] is not None and sensor_name != "world":
+                    self.spool.write(sensor_name, data[sensor_name], self.sim_time)
+
+    def _close_spool(self) -> None:
+        """Closes spool files.
+        """
+        if self.spool is not None:
+            try:
+                self.spool.close()
+            except Exception as error:
+                print(error)
+
+    def _init_checkpoint(self, resume: bool) -> None:
+        """Loads last checkpoint and truncates data written after it.
+        """
+        self.checkpoint_path = os.path.join(self.out_path, "checkpoint.json")
+        self.checkpoint = None
+        self.resume_time = None
+        self.last_checkpoint = 0.0
+        if resume and os.path.exists(self.checkpoint_path):
+            self.checkpoint = read_json(self.checkpoint_path)
+            print("# === Resuming From", self.checkpoint["sim_time"], "s === #")
+            self.events_writer.resume(self.checkpoint["events"])
+            self.gray_writer.resume(self.checkpoint["gray"])
+            self.flow_writer.resume(self.checkpoint["flow"])
+            if self.index_builder is not None:
+                self.index_builder.resume()
+            self.resume_time = self.checkpoint["sim_time"]
+            self.last_checkpoint = self.resume_time
+        elif self.events_writer is not None and any(
+            name in data_group for name, data_group in [
+                ("x", self.events_writer.events_group),
+                ("gray_images", self.gray_writer.gray_file),
+                ("flows", self.flow_writer.flow_file)
+            ]
+        ):
+            # Data without checkpoint cannot be truncated to a known state
+            raise RuntimeError(
+                "Output %s already holds data without a checkpoint to resume "
+                "from, remove it to convert again." % self.out_path
+            )
+
+    def _init_window(self) -> None:
+        """Initializes time window of data to write.
+        """
+        self.data_start_time = None
+        self.data_end_time = None
+        if self.window is not None:
+            self.data_start_time, self.data_end_time = self.window
+        if self.resume_time is not None:
+            # Data up to the checkpoint is already written
+            self.data_start_time = max(
+                self.resume_time + self.delta_time, self.data_start_time or 0.0
+            )
+        # Replay from before the window so sensors can settle
+        self.time_offset = 0.0
+        if self.data_start_time is not None and self.data_start_time > 0.0:
+            # Sensors capture from their spawn, so the offset stays on the
+            # capture grid of a replay from the start
+            capture_ticks = get_capture_ticks(self.delta_time, self.sensors)
+            warmup_ticks = math.floor(
+                (self.data_start_time - self.warmup_margin)/(capture_ticks*self.delta_time)
+            )*capture_ticks
+            self.time_offset = max(warmup_ticks*self.delta_time, 0.0)
+
+    def _save_checkpoint(self) -> None:
+        """Saves writers state and simulation time.
+        """
+        if self.pipeline is not None:
+            self.pipeline.flush()
+        self.events_buffer.flush()
+        for writer in [self.events_writer, self.gray_writer, self.flow_writer]:
+            writer.flush()
+        checkpoint = {
+            "sim_time": self.sim_time,
+            "events": self.events_writer.get_size(),
+            "gray": self.gray_writer.get_size(),
+            "flow": self.flow_writer.get_size()
+        }
+        temp_path = self.checkpoint_path + ".tmp"
+        save_json(checkpoint, temp_path)
+        os.replace(temp_path, self.checkpoint_path)
+        self.last_checkpoint = self.sim_time
 
     def _read_recording(self) -> None:
         """Reads recording.
         """
-        self.client.replay_file(self.record_path, 0, 0, 0, False)
+        self.client.replay_file(self.record_path, self.time_offset, 0, 0, False)
+        self.active_actor = wait_until(
+            self._tick_hero_actor, timeout=self.init_timeout,
+            message="No replayed vehicle in %s." % self.record_path
+        )
+
+    def _tick_hero_actor(self) -> Any:
+        """Ticks world so replayed actors appear, then returns the hero.
+        """
         self.world.tick()
-        # TODO: Use this later
+        return self._get_hero_actor()
+
+    def _get_hero_actor(self) -> Any:
+        """Returns replayed hero vehicle, or any vehicle if none is tagged.
+        """
         self.world_actors = self.world.get_actors().filter("vehicle.*")
-        self.active_actor = self.world_actors[0]
+        if len(self.world_actors) == 0:
+            return None
+        active_actor = self.world_actors[0]
         for actor in self.world_actors:
             if actor.attributes["role_name"] == "hero":
-                self.active_actor = actor
+                active_actor = actor
+        return active_actor
 
     def _destroy_actors(self) -> None:
         """Destroy all actors.
@@ -91,15 +262,67 @@ class ScenarioReader(ScenarioBase):
             actor.destroy()
         """
 
+    def _extract_sensor(
+        self, sensor_name: str, sensor_data: Any, sim_time: float
+    ) -> Tuple[Any, Any, Any]:
+        """Extracts single sensor data.
+        """
+        with self.profiler.measure("extract." + sensor_name):
+            return self._apply_extract(sensor_name, sensor_data, sim_time)
+
+    def _apply_extract(
+        self, sensor_name: str, sensor_data: Any, sim_time: float
+    ) -> Tuple[Any, Any, Any]:
+        """Applies sensor extraction function, keeping its preview image.
+        """
+        sensor_data = getattr(
+            extract, "extract_" + sensor_name
+        )(
+            sensor_data, sim_time=sim_time,
+            **self.extract_options.get(sensor_name, {})
+        )
+        self.images.update({sensor_name: sensor_data[2]})
+        return sensor_data
+
+    def _save_sensor(self, sensor_name: str, sensor_data: Tuple[Any, Any, Any]) -> None:
+        """Saves single sensor data to disk.
+        """
+        with self.profiler.measure("write." + sensor_name):
+            self._write_sensor(sensor_name, sensor_data)
+
+    def _write_sensor(self, sensor_name: str, sensor_data: Tuple[Any, Any, Any]) -> None:
+        """Writes single sensor data with its writer.
+        """
+        if sensor_name == "events":
+            self.events_buffer.write(sensor_data[0])
+        elif sensor_name == "gray":
+            self.gray_writer.write(gray_image=sensor_data[0], time=sensor_data[1])
+        elif sensor_name == "flow":
+            self.flow_writer.write(flow=sensor_data[0], time=sensor_data[1])
+        else:
+            # TODO: Add error message
+            raise NotImplementedError
+        # Indices follow written data
+        if self.index_builder is not None and sensor_name != "events":
+            self.index_builder.add_frame(sensor_name, sensor_data[1])
+
+    def _process_sensor(self, sensor_name: str, sensor_data: Any, sim_time: float) -> None:
+        """Extracts and saves single sensor data, runs on pipeline workers.
+        """
+        # Worker stages overlap later ticks, they are profiled apart
+        with self.profiler.measure_worker("extract." + sensor_name, sim_time):
+            sensor_data = self._apply_extract(sensor_name, sensor_data, sim_time)
+        with self.profiler.measure_worker("write." + sensor_name, sim_time):
+            self._write_sensor(sensor_name, sensor_data)
+
     def _extract_data(self, data: Dict[str, Any]) -> None:
         """Extracts sensor data.
         """
         for sensor_name in data.keys():
             if data[sensor_name] is not None and sensor_name != "world":
-                data[sensor_name] = getattr(
-                    extract, "extract_" + sensor_name
-                )(data[sensor_name], sim_time=self.sim_time)
-                self.images.update({sensor_name: data[sensor_name][2]})
+                data[sensor_name] = self._extract_sensor(
+                    sensor_name, data[sensor_name], self.sim_time
+                )
         return data
 
     def _save_data(self, data: Dict[str, Any]) -> None:
@@ -107,87 +330,160 @@ class ScenarioReader(ScenarioBase):
         """
         for sensor_name in data.keys():
             if data[sensor_name] is not None and sensor_name != "world":
-                if sensor_name == "events":
-                    self.events_writer.write(events=data[sensor_name][0])
-                elif sensor_name == "gray":
-                    self.gray_writer.write(gray_image=data[sensor_name][0], time=data[sensor_name][1])
-                elif sensor_name == "flow":
-                    self.flow_writer.write(flow=data[sensor_name][0], time=data[sensor_name][1])
-                else:
-                    # TODO: Add error message
-                    raise NotImplementedError
-
-    def _print_data(self, data: Dict[str, Any]) -> None:
-        """Prints data status.
-        """
-        for sensor_name, info in data.items():
-            print(sensor_name + ":", info is not None)
+                self._save_sensor(sensor_name, data[sensor_name])
+
+    def _init_pipeline(self) -> None:
+        """Initializes extraction and writing pipeline.
+        """
+        self.pipeline = None
+        if self.pipelined:
+            self.pipeline = SensorPipeline(stages={
+                sensor.get_name(): partial(self._process_sensor, sensor.get_name())
+                for sensor in self.active_sensors
+            }, max_size=self.pipeline_size)
+
+    def _queue_data(self, data: Dict[str, Any]) -> None:
+        """Queues raw sensor data to the pipeline.
+        """
+        for sensor_name in data.keys():
+            if data[sensor_name] is not None and sensor_name != "world":
+                self.pipeline.put(sensor_name, data[sensor_name], self.sim_time)
+
+    def _close_pipeline(self) -> None:
+        """Flushes pending pipeline work.
+        """
+        if self.pipeline is not None:
+            try:
+                self.pipeline.close()
+            except Exception as error:
+                print(error)
+
+    def _flush_events(self) -> None:
+        """Writes events still buffered on shutdown.
+        """
+        if self.events_buffer is None:
+            return
+        try:
+            self.events_buffer.flush()
+        except Exception as error:
+            print(error)
+
+    def _get_stats(self, sensor_sync: SensorSync) -> Dict[str, Any]:
+        """Returns memory usage, queue depths and missed frames.
+        """
+        stats = sensor_sync.get_stats()
+        depths = {name: info["depth"] for name, info in stats["buffers"].items()}
+        if self.pipeline is not None:
+            depths.update({
+                name + "_pipeline": depth
+                for name, depth in self.pipeline.get_depths().items()
+            })
+        misses = {name: info["misses"] for name, info in stats["buffers"].items()}
+        return {
+            "Memory": "%.1f MB" % (stats["memory"]/1e6),
+            "Queues": depths,
+            "Misses": misses
+        }
 
     def _map_data(self) -> None:
-        """Maps data.
+        """Completes indices built while writing.
         """
-        self.events_writer.map_time_to_events()
-        self.gray_writer.map_time_to_gray()
-        self.gray_writer.map_gray_to_events()
-        self.flow_writer.map_time_to_flow()
-        self.flow_writer.map_flow_to_events()
+        self.index_builder.finalize()
 
     def _render_display(self) -> None:
         """Renders display.
         """
-        if self.images["gray"] is not None:
-            self.game.render_image(self.images["gray"], blend=False)
-        if self.images["events"] is not None:
-            self.game.render_image(self.images["events"], blend=True)
-        if self.images["flow"] is not None:
-            self.game.render_image(self.images["flow"], blend=True)
+        overlays = [
+            self.images[name] for name in ["events", "flow"]
+            if self.images[name] is not None
+        ]
+        self.game.render_layers(base=self.images["gray"], overlays=overlays)
 
     # === Main Looping Function === #
     def loop(self) -> None:
         """Loops synchronous simulation.
         """
         try:
-            self.sim_time = 0.0
-            self.real_time = time.time()
+            self.sim_time = self.time_offset
+            self.completed = False
+            self._init_pipeline()
             # Run in synchronous mode
+            # Warm-up margin replaces start time when replaying from an offset
+            sync_start_time = self.start_time if self.time_offset == 0.0 else 0.0
             with SensorSync(
                 world=self.world, sensors=self.active_sensors,
-                start_time=self.start_time, delta_time=self.delta_time
+                start_time=sync_start_time, delta_time=self.delta_time,
+                profiler=self.profiler, init_timeout=self.init_timeout
             ) as sensor_sync:
                 # Main loop
                 while True:
                     # Tick PyGame window
-                    if self.game.should_quit():
-                        return
                     self.game.tick_clock()
                     # Parse data
                     data = sensor_sync.tick(timeout=2.0)
+                    self.sim_time = sensor_sync.get_sim_time() + self.time_offset
+                    # Stop at end of time window
+                    if self.data_end_time is not None and (
+                        self.sim_time > self.data_end_time - 0.5*self.delta_time
+                    ):
+                        self.completed = True
+                        return
+                    # Extract data, skipping warm-up and already written data
+                    if self.data_start_time is not None and (
+                        self.sim_time < self.data_start_time - 0.5*self.delta_time
+                    ):
+                        pass
+                    elif self.spool is not None:
+                        self._spool_data(data)
+                    elif self.pipeline is not None:
+                        self._queue_data(data)
+                    else:
+                        data = self._extract_data(data)
+                        self._save_data(data)
+                    # Save checkpoint
+                    if self.checkpoint_period is not None and (
+                        self.sim_time - self.last_checkpoint >= self.checkpoint_period
+                    ):
+                        self._save_checkpoint()
+                    if self.game.should_render():
+                        with self.profiler.measure("render"):
+                            # Closing the preview leaves the output incomplete
+                            if self.game.should_quit():
+                                return
+                            self._render_display()
+                            if self.sim_time > self.start_time:
+                                self.game.render_sim_time(self.sim_time)
+                            self.game.flip()
                     # Print status
-                    print("=====", "Frame ID:", data["world"], "=====")
-                    # Extract data
-                    data = self._extract_data(data)
-                    self._print_data(data)
-                    print("Sim Time:", str(timedelta(seconds=self.sim_time)))
-                    print("Real Time:", str(timedelta(seconds=time.time() - self.real_time)))
-                    self._save_data(data)
-                    self._render_display()
-
-                    if self.sim_time > self.start_time:
-                        self.game.render_sim_time(self.sim_time)
-                    self.game.flip()
-
-                    self.sim_time += self.delta_time
-                    if self.sim_time > (self.record_delta_time - self.start_time):
+                    self.profiler.end_tick(
+                        frame=data["world"], sim_time=self.sim_time,
+                        info=partial(self._get_stats, sensor_sync)
+                    )
+
+                    # Stop once the next tick is past the recording end
+                    if self.sim_time + self.delta_time > (
+                        self.record_delta_time - self.start_time + 0.5*self.delta_time
+                    ):
+                        self.completed = True
                         return
         # TODO: Debug code here
         except Exception as error:
             print(error)
         finally:
+            self._close_pipeline()
+            self._close_spool()
+            self._flush_events()
+            self.profiler.close()
             self.game.quit()
             self._reset_settings()
             self._destroy_actors()
             print("Actors destroyed.")
             self._destroy_sensors()
             print("All simulation elements reset.")
-            print("# === Mapping Data === #")
-            self._map_data()
+            if self.checkpoint_period is not None and not self.completed:
+                print("# === Conversion Interrupted, Resume From Checkpoint === #")
+            elif self.index_builder is not None:
+                print("# === Mapping Data === #")
+                self._map_data()
+            if self.completed and os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
@@ -0,0 +1,185 @@
+import os
+import shutil
+
+import h5py
+
+from .batch import BatchPool, get_windows_dir
+from .utils.fingerprint import get_inputs, get_stamp, read_stamp, write_stamp
+from .utils.fingerprint import is_current, is_output, remove_output
+from .utils.extract import EventPacket
+from .utils.writers import WriterEventPackets, WriterGrayResumable, WriterFlowResumable
+from .utils.index import IndexBuilder
+
+from ewiz.core.utils import create_dir
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+def split_windows(
+    start_time: float,
+    end_time: float,
+    num_windows: int,
+    delta_time: float
+) -> List[Tuple[float, float]]:
+    """Splits time range into windows aligned to the simulation tick, the
+    end time included.
+    """
+    num_ticks = int(round((end_time - start_time)/delta_time))
+    start_tick = int(round(start_time/delta_time))
+    bounds = [
+        (start_tick + int(round(i*num_ticks/num_windows)))*delta_time
+        for i in range(num_windows + 1)
+    ]
+    # Windows are half-open, the first and last ones follow the reader bounds
+    bounds[0] = start_time
+    bounds[-1] = end_time + delta_time
+    return [(bounds[i], bounds[i + 1]) for i in range(num_windows)]
+
+
+def shard_recording_jobs(
+    job: Dict[str, Any],
+    windows: List[Tuple[float, float]]
+) -> List[Dict[str, Any]]:
+    """Creates one job per time window of a recording.
+    """
+    windows_dir = get_windows_dir(job["out_path"])
+    window_jobs = []
+    for i, window in enumerate(windows):
+        window_name = job["name"] + "_window_%02d" % i
+        window_jobs.append(dict(
+            job,
+            name=window_name,
+            out_path=os.path.join(windows_dir, "window_%02d" % i),
+            group=window_name,
+            window=list(window),
+            status="pending"
+        ))
+    return window_jobs
+
+
+def stitch_windows(
+    window_paths: List[str],
+    out_path: str,
+    chunk_size: int = 1000000
+) -> None:
+    """Stitches per-window outputs, in time order, into a single dataset and
+    indexes it.
+    """
+    out_path = create_dir(out_path)
+    shutil.copy(
+        os.path.join(window_paths[0], "props.json"),
+        os.path.join(out_path, "props.json")
+    )
+    events_writer = WriterEventPackets(out_path)
+    gray_writer = WriterGrayResumable(out_path)
+    flow_writer = WriterFlowResumable(out_path)
+    index_builder = IndexBuilder(
+        events_writer=events_writer,
+        frame_writers={
+            "gray": (gray_writer, gray_writer.gray_file),
+            "flow": (flow_writer, flow_writer.flow_file)
+        }
+    )
+
+    print("# === Stitching Windows === #")
+    for window_path in window_paths:
+        # Window timestamps are stored relative to their own offsets
+        with h5py.File(os.path.join(window_path, "events.hdf5"), "r") as events_file:
+            if "time_offset" in events_file:
+                time_offset = events_file["time_offset"][0]
+                events_group = events_file["events"]
+                num_events = events_group["x"].shape[0]
+                for i in range(0, num_events, chunk_size):
+                    events = EventPacket(
+                        x=events_group["x"][i:i + chunk_size],
+                        y=events_group["y"][i:i + chunk_size],
+                        t=events_group["time"][i:i + chunk_size] + time_offset,
+                        pol=events_group["polarity"][i:i + chunk_size]
+                    )
+                    events_writer.write(events)
+                    index_builder.add_events(events)
+        with h5py.File(os.path.join(window_path, "gray.hdf5"), "r") as gray_file:
+            if "time_offset" in gray_file:
+                time_offset = gray_file["time_offset"][0]
+                for i in range(gray_file["gray_images"].shape[0]):
+                    time = int(gray_file["time"][i] + time_offset)
+                    gray_writer.write(gray_image=gray_file["gray_images"][i], time=time)
+                    index_builder.add_frame("gray", time)
+        with h5py.File(os.path.join(window_path, "flow.hdf5"), "r") as flow_file:
+            if "time_offset" in flow_file:
+                time_offset = flow_file["time_offset"][0]
+                for i in range(flow_file["flows"].shape[0]):
+                    time = int(flow_file["time"][i] + time_offset)
+                    flow_writer.write(flow=flow_file["flows"][i], time=time)
+                    index_builder.add_frame("flow", time)
+
+    print("# === Mapping Data === #")
+    index_builder.finalize()
+
+
+def convert_sharded(
+    endpoints: List[Tuple[str, int, int]],
+    job: Dict[str, Any],
+    num_windows: int,
+    start_time: float = 0.5,
+    delta_time: float = 0.1,
+    record_delta_time: float = 60.0,
+    warmup_margin: float = 1.0,
+    manifest_path: str = None,
+    cache_outputs: bool = True,
+    keep_windows: bool = False,
+    **kwargs
+) -> Dict[str, Any]:
+    """Converts a recording as parallel time windows, then stitches them.
+    Window outputs are removed once stitched, unless kept.
+    """
+    previous = read_stamp(job["out_path"])
+    stamp = get_stamp(job["record_path"], get_inputs(job, dict(
+        kwargs, start_time=start_time, delta_time=delta_time,
+        record_delta_time=record_delta_time, warmup_margin=warmup_margin,
+        num_windows=num_windows
+    )), previous)
+    if cache_outputs and is_current(job["out_path"], stamp):
+        print("Up to date:", job["out_path"])
+        job["status"] = "done"
+        job["cached"] = True
+        return job
+    if previous is None and is_output(job["out_path"]):
+        # Outputs not written by this tool are never removed
+        print("Unstamped output, skipping:", job["out_path"])
+        job["status"] = "skipped"
+        job["error"] = "Output exists without fingerprint, remove it to convert again."
+        return job
+    windows = split_windows(
+        start_time, record_delta_time - start_time, num_windows, delta_time
+    )
+    window_jobs = shard_recording_jobs(job, windows)
+    batch_pool = BatchPool(
+        endpoints=endpoints,
+        jobs=window_jobs,
+        manifest_path=manifest_path,
+        cache_outputs=cache_outputs,
+        start_time=start_time,
+        delta_time=delta_time,
+        record_delta_time=record_delta_time,
+        warmup_margin=warmup_margin,
+        map_data=False,
+        **kwargs
+    )
+    batch_pool.run()
+    failed = [window_job["name"] for window_job in window_jobs if window_job["status"] != "done"]
+    if failed:
+        job["status"] = "failed"
+        job["error"] = "Windows not converted: " + ", ".join(failed)
+        return job
+    # Stitching appends, start from an empty output
+    remove_output(job["out_path"])
+    write_stamp(job["out_path"], stamp, complete=False)
+    stitch_windows([window_job["out_path"] for window_job in window_jobs], job["out_path"])
+    write_stamp(job["out_path"], stamp, complete=True)
+    windows_dir = get_windows_dir(job["out_path"])
+    if not keep_windows and os.path.isdir(windows_dir):
+        print("Removing stitched windows:", windows_dir)
+        shutil.rmtree(windows_dir)
+    job["status"] = "done"
+    return job
@@ -0,0 +1,817 @@
+"""Local stand-in for the subset of the CARLA client API used by eCARLA,
+producing synthetic sensor payloads for headless throughput testing.
+"""
+import sys
+import enum
+import time
+import types
+import fnmatch
+import itertools
+
+import numpy as np
+
+from .utils.extract import EVENT_DTYPE, DVS_TIME_DIVISOR
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+# Stand-in defaults, changed with install()
+_config = {
+    "event_rate": 2e6,
+    "tick_latency": 0.0,
+    "num_frames": 8,
+    "seed": 0
+}
+
+
+# === Geometry === #
+class Location():
+    """Location stand-in.
+    """
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0) -> None:
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class Rotation():
+    """Rotation stand-in.
+    """
+    def __init__(self, pitch: float = 0.0, yaw: float = 0.0, roll: float = 0.0) -> None:
+        self.pitch = pitch
+        self.yaw = yaw
+        self.roll = roll
+
+
+class Transform():
+    """Transform stand-in.
+    """
+    def __init__(self, location: Location = None, rotation: Rotation = None) -> None:
+        self.location = Location() if location is None else location
+        self.rotation = Rotation() if rotation is None else rotation
+
+
+# === Settings === #
+class WeatherParameters():
+    """Weather presets stand-in.
+    """
+    def __init__(self, name: str = "Default") -> None:
+        self.name = name
+
+
+for _weather in [
+    "Default", "ClearNoon", "CloudyNoon", "WetNoon", "WetCloudyNoon",
+    "SoftRainNoon", "MidRainyNoon", "HardRainNoon", "ClearSunset",
+    "CloudySunset", "WetSunset", "WetCloudySunset", "SoftRainSunset",
+    "MidRainSunset", "HardRainSunset"
+]:
+    setattr(WeatherParameters, _weather, WeatherParameters(_weather))
+
+
+class WorldSettings():
+    """World settings stand-in.
+    """
+    def __init__(
+        self,
+        no_rendering_mode: bool = False,
+        synchronous_mode: bool = False,
+        fixed_delta_seconds: float = None
+    ) -> None:
+        self.no_rendering_mode = no_rendering_mode
+        self.synchronous_mode = synchronous_mode
+        self.fixed_delta_seconds = fixed_delta_seconds
+
+
+class VehicleControl():
+    """Vehicle control stand-in.
+    """
+    def __init__(self) -> None:
+        self.throttle = 0.0
+        self.steer = 0.0
+        self.brake = 0.0
+        self.hand_brake = False
+        self.reverse = False
+        self.manual_gear_shift = False
+        self.gear = 0
+
+
+class VehicleLightState(enum.IntFlag):
+    """Vehicle light state stand-in.
+    """
+    NONE = 0
+    Position = 1
+    LowBeam = 2
+    HighBeam = 4
+    Brake = 8
+    RightBlinker = 16
+    LeftBlinker = 32
+    Reverse = 64
+    Fog = 128
+    Interior = 256
+    Special1 = 512
+    Special2 = 1024
+    All = 2047
+
+
+# === Snapshots and Sensor Data === #
+class Timestamp():
+    """World timestamp stand-in.
+    """
+    def __init__(self, frame: int, elapsed_seconds: float, delta_seconds: float) -> None:
+        self.frame = frame
+        self.elapsed_seconds = elapsed_seconds
+        self.delta_seconds = delta_seconds
+        self.platform_timestamp = time.time()
+
+
+class WorldSnapshot():
+    """World snapshot stand-in.
+    """
+    def __init__(self, frame: int, elapsed_seconds: float, delta_seconds: float) -> None:
+        self.frame = frame
+        self.timestamp = Timestamp(frame, elapsed_seconds, delta_seconds)
+
+
+class SensorData():
+    """Sensor measurement stand-in, raw data shares a read-only buffer.
+    """
+    def __init__(
+        self,
+        frame: int,
+        timestamp: float,
+        transform: Transform,
+        raw_data: np.ndarray,
+        width: int,
+        height: int
+    ) -> None:
+        self.frame = frame
+        self.timestamp = timestamp
+        self.transform = transform
+        self.raw_data = memoryview(raw_data).cast("B")
+        self.width = width
+        self.height = height
+
+    def __len__(self) -> int:
+        return self.raw_data.nbytes
+
+
+# === Blueprints === #
+class ActorAttribute():
+    """Blueprint attribute stand-in.
+    """
+    def __init__(self, value: str, recommended_values: List[str] = None) -> None:
+        self.value = str(value)
+        self.recommended_values = [str(v) for v in (recommended_values or [value])]
+
+    def __int__(self) -> int:
+        return int(float(self.value))
+
+    def __float__(self) -> float:
+        return float(self.value)
+
+    def __str__(self) -> str:
+        return self.value
+
+    def as_int(self) -> int:
+        return int(self)
+
+    def as_float(self) -> float:
+        return float(self)
+
+    def as_str(self) -> str:
+        return self.value
+
+
+class ActorBlueprint():
+    """Actor blueprint stand-in.
+    """
+    def __init__(self, blueprint_id: str, attributes: Dict[str, Any] = None) -> None:
+        self.id = blueprint_id
+        self.tags = blueprint_id.split(".")
+        self.attributes: Dict[str, ActorAttribute] = {}
+        for name, value in (attributes or {}).items():
+            if isinstance(value, list):
+                self.attributes[name] = ActorAttribute(value[0], value)
+            else:
+                self.attributes[name] = ActorAttribute(value)
+
+    def copy(self) -> "ActorBlueprint":
+        """Returns independent copy of the blueprint.
+        """
+        blueprint = ActorBlueprint(self.id)
+        blueprint.attributes = {
+            name: ActorAttribute(a.value, a.recommended_values)
+            for name, a in self.attributes.items()
+        }
+        return blueprint
+
+    def has_attribute(self, name: str) -> bool:
+        return name in self.attributes
+
+    def get_attribute(self, name: str) -> ActorAttribute:
+        return self.attributes[name]
+
+    def set_attribute(self, name: str, value: Any) -> None:
+        if name not in self.attributes:
+            raise IndexError("Blueprint %s has no attribute %s." % (self.id, name))
+        self.attributes[name].value = str(value)
+
+
+_SENSOR_ATTRIBUTES = {
+    "image_size_x": "800", "image_size_y": "600", "fov": "90", "sensor_tick": "0.0"
+}
+_DVS_ATTRIBUTES = {
+    "positive_threshold": "0.3", "negative_threshold": "0.3",
+    "sigma_positive_threshold": "0", "sigma_negative_threshold": "0",
+    "refractory_period_ns": "0", "use_log": "true", "log_eps": "0.001"
+}
+_VEHICLE_ATTRIBUTES = {
+    "number_of_wheels": "4", "generation": "2", "role_name": ["autopilot", "hero"],
+    "color": ["255,255,255", "0,0,0", "200,20,20"], "driver_id": ["0", "1"]
+}
+
+
+def _create_blueprints() -> List[ActorBlueprint]:
+    """Creates blueprints known to the stand-in.
+    """
+    blueprints = [
+        ActorBlueprint("sensor.camera.rgb", _SENSOR_ATTRIBUTES),
+        ActorBlueprint("sensor.camera.dvs", {**_SENSOR_ATTRIBUTES, **_DVS_ATTRIBUTES}),
+        ActorBlueprint("sensor.camera.optical_flow", _SENSOR_ATTRIBUTES),
+        ActorBlueprint("controller.ai.walker")
+    ]
+    for vehicle_id in [
+        "vehicle.tesla.cybertruck", "vehicle.audi.a2", "vehicle.lincoln.mkz_2020",
+        "vehicle.nissan.patrol", "vehicle.mini.cooper_s"
+    ]:
+        blueprints.append(ActorBlueprint(vehicle_id, _VEHICLE_ATTRIBUTES))
+    blueprints.append(ActorBlueprint(
+        "vehicle.harley-davidson.low_rider", {**_VEHICLE_ATTRIBUTES, "number_of_wheels": "2"}
+    ))
+    for i in range(1, 5):
+        blueprints.append(ActorBlueprint("walker.pedestrian.%04d" % i, {
+            "generation": "2", "is_invincible": "true",
+            "speed": ["0.0", "1.4", "2.5"], "role_name": "pedestrian"
+        }))
+    return blueprints
+
+
+class BlueprintLibrary():
+    """Blueprint library stand-in, lookups return copies.
+    """
+    def __init__(self, blueprints: List[ActorBlueprint]) -> None:
+        self.blueprints = blueprints
+
+    def find(self, blueprint_id: str) -> ActorBlueprint:
+        for blueprint in self.blueprints:
+            if blueprint.id == blueprint_id:
+                return blueprint.copy()
+        raise IndexError("Blueprint %s not found." % blueprint_id)
+
+    def filter(self, pattern: str) -> "BlueprintLibrary":
+        return BlueprintLibrary([
+            blueprint.copy() for blueprint in self.blueprints
+            if fnmatch.fnmatch(blueprint.id, pattern)
+        ])
+
+    def __iter__(self) -> Any:
+        return iter(self.blueprints)
+
+    def __len__(self) -> int:
+        return len(self.blueprints)
+
+    def __getitem__(self, index: int) -> ActorBlueprint:
+        return self.blueprints[index]
+
+
+# === Actors === #
+class Actor():
+    """Actor stand-in.
+    """
+    def __init__(
+        self,
+        world: "World",
+        actor_id: int,
+        blueprint: ActorBlueprint,
+        transform: Transform,
+        parent: "Actor" = None
+    ) -> None:
+        self.world = world
+        self.id = actor_id
+        self.type_id = blueprint.id
+        self.attributes = {name: a.value for name, a in blueprint.attributes.items()}
+        self.transform = transform
+        self.parent = parent
+        self.is_alive = True
+
+    def destroy(self) -> bool:
+        if not self.is_alive:
+            return False
+        self.is_alive = False
+        self.world._remove_actor(self)
+        return True
+
+    def get_transform(self) -> Transform:
+        return self.transform
+
+    def get_location(self) -> Location:
+        return self.transform.location
+
+    def get_velocity(self) -> Location:
+        return Location()
+
+    # Vehicle and walker controls are accepted and ignored
+    def get_physics_control(self) -> Any:
+        return types.SimpleNamespace(use_sweep_wheel_collision=False)
+
+    def apply_physics_control(self, physics_control: Any) -> None:
+        pass
+
+    def set_autopilot(self, enabled: bool = True, port: int = 8000) -> None:
+        pass
+
+    def apply_control(self, control: Any) -> None:
+        self.control = control
+
+    def set_light_state(self, light_state: Any) -> None:
+        self.light_state = light_state
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def go_to_location(self, location: Location) -> None:
+        pass
+
+    def set_max_speed(self, speed: float) -> None:
+        pass
+
+
+class ActorList(list):
+    """Actor list stand-in.
+    """
+    def filter(self, pattern: str) -> "ActorList":
+        return ActorList([a for a in self if fnmatch.fnmatch(a.type_id, pattern)])
+
+    def find(self, actor_id: int) -> Actor:
+        for actor in self:
+            if actor.id == actor_id:
+                return actor
+        return None
+
+
+class Sensor(Actor):
+    """Sensor stand-in, producing synthetic measurements on world ticks.
+    """
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.callback = None
+        self.width = int(float(self.attributes["image_size_x"]))
+        self.height = int(float(self.attributes["image_size_y"]))
+        self.sensor_tick = float(self.attributes["sensor_tick"])
+        self.last_time = None
+        self.payloads = _Payloads(self.type_id, self.width, self.height)
+
+    def listen(self, callback: Callable[[Any], None]) -> None:
+        self.callback = callback
+
+    def stop(self) -> None:
+        self.callback = None
+
+    def is_listening(self) -> bool:
+        return self.callback is not None
+
+    def _measure(self, snapshot: WorldSnapshot) -> None:
+        """Delivers a measurement if the sensor tick elapsed.
+        """
+        elapsed_time = snapshot.timestamp.elapsed_seconds
+        if self.last_time is not None and (
+            elapsed_time - self.last_time < self.sensor_tick - 1e-9
+        ):
+            return
+        start_time = snapshot.timestamp.elapsed_seconds - snapshot.timestamp.delta_seconds
+        if self.last_time is not None:
+            start_time = self.last_time
+        self.last_time = elapsed_time
+        if self.callback is None:
+            return
+        raw_data = self.payloads.get(snapshot.frame, start_time, elapsed_time)
+        self.callback(SensorData(
+            frame=snapshot.frame, timestamp=elapsed_time, transform=self.transform,
+            raw_data=raw_data, width=self.width, height=self.height
+        ))
+
+
+class _Payloads():
+    """Synthetic sensor payloads, precomputed once per sensor and cycled.
+    """
+    def __init__(self, type_id: str, width: int, height: int) -> None:
+        self.type_id = type_id
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(_config["seed"])
+        self.num_frames = _config["num_frames"]
+        self.event_rate = _config["event_rate"]
+        self._init_payloads()
+
+    def _init_payloads(self) -> None:
+        """Precomputes image frames or event pools.
+        """
+        self.frames: List[np.ndarray] = []
+        y, x = np.mgrid[0:self.height, 0:self.width]
+        for i in range(self.num_frames):
+            phase = 2*np.pi*i/self.num_frames
+            if self.type_id == "sensor.camera.rgb":
+                # Moving gradient with noise, BGRA
+                image = np.empty((self.height, self.width, 4), dtype=np.uint8)
+                base = 127 + 100*np.sin(x/37.0 + phase)*np.cos(y/29.0 - phase)
+                noise = self.rng.integers(0, 24, size=(self.height, self.width))
+                for c in range(3):
+                    image[:, :, c] = np.clip(base + noise + 30*c, 0, 255)
+                image[:, :, 3] = 255
+            elif self.type_id == "sensor.camera.optical_flow":
+                # Smooth flow field, normalized by image size
+                image = np.empty((self.height, self.width, 2), dtype=np.float32)
+                image[:, :, 0] = 0.02*np.sin(y/50.0 + phase)
+                image[:, :, 1] = 0.02*np.cos(x/50.0 + phase)
+            else:
+                continue
+            image.flags.writeable = False
+            self.frames.append(image)
+        if self.type_id == "sensor.camera.dvs":
+            # Pools sliced per tick, sized for twice the mean rate
+            pool_size = max(int(2*self.event_rate*0.1), 1024)
+            self.pool_x = self.rng.integers(0, self.width, pool_size, dtype=np.uint16)
+            self.pool_y = self.rng.integers(0, self.height, pool_size, dtype=np.uint16)
+            self.pool_pol = self.rng.integers(0, 2, pool_size).astype(bool)
+            self.pool_offset = 0
+
+    def _get_events(self, start_time: float, end_time: float) -> np.ndarray:
+        """Returns events spread over the measurement interval.
+        """
+        num_events = int(self.rng.poisson(self.event_rate*max(end_time - start_time, 0.0)))
+        num_events = min(num_events, self.pool_x.shape[0])
+        events = np.empty(num_events, dtype=EVENT_DTYPE)
+        indices = (self.pool_offset + np.arange(num_events)) % self.pool_x.shape[0]
+        self.pool_offset = (self.pool_offset + num_events) % self.pool_x.shape[0]
+        events["x"] = self.pool_x[indices]
+        events["y"] = self.pool_y[indices]
+        events["pol"] = self.pool_pol[indices]
+        # Sensor time units, sorted within the interval
+        scale = 1e6*DVS_TIME_DIVISOR
+        events["t"] = np.linspace(
+            int(start_time*scale) + 1, int(end_time*scale), num_events, dtype=np.int64
+        )
+        return events
+
+    def get(self, frame: int, start_time: float, end_time: float) -> np.ndarray:
+        """Returns payload of a measurement.
+        """
+        if self.type_id == "sensor.camera.dvs":
+            return self._get_events(start_time, end_time)
+        return self.frames[frame % len(self.frames)]
+
+
+# === World === #
+class Map():
+    """Map stand-in with synthetic spawn points.
+    """
+    def __init__(self, name: str) -> None:
+        self.name = "Carla/Maps/" + name
+
+    def get_spawn_points(self) -> List[Transform]:
+        return [
+            Transform(Location(x=20.0*i, y=10.0*j, z=0.5), Rotation(yaw=90.0*(i % 4)))
+            for i in range(10) for j in range(10)
+        ]
+
+
+class World():
+    """World stand-in, ticking synchronously on the caller thread.
+    """
+    def __init__(self, server: "_Server", map_name: str) -> None:
+        self.server = server
+        self.id = next(server.world_ids)
+        self.map = Map(map_name)
+        self.settings = WorldSettings()
+        self.weather = WeatherParameters.Default
+        self.frame = 0
+        self.elapsed_seconds = 0.0
+        self.delta_seconds = 0.05
+        self.actors: Dict[int, Actor] = {}
+        self.callbacks: Dict[int, Callable[[WorldSnapshot], None]] = {}
+        self.callback_ids = itertools.count(1)
+        self.replay = None
+        self.blueprint_library = BlueprintLibrary(_create_blueprints())
+
+    def _remove_actor(self, actor: Actor) -> None:
+        self.actors.pop(actor.id, None)
+
+    def _spawn(
+        self,
+        blueprint: ActorBlueprint,
+        transform: Transform,
+        parent: Actor = None
+    ) -> Actor:
+        """Spawns actor of blueprint.
+        """
+        actor_class = Sensor if blueprint.id.startswith("sensor.") else Actor
+        actor = actor_class(self, next(self.server.actor_ids), blueprint, transform, parent)
+        self.actors[actor.id] = actor
+        return actor
+
+    def _step(self) -> WorldSnapshot:
+        """Advances simulation by one step and notifies listeners.
+        """
+        if _config["tick_latency"] > 0.0:
+            time.sleep(_config["tick_latency"])
+        delta_seconds = self.settings.fixed_delta_seconds or self.delta_seconds
+        self.frame += 1
+        self.elapsed_seconds += delta_seconds
+        # Replayed actors appear on the first tick after replay starts
+        if self.replay is not None:
+            blueprint = self.blueprint_library.find("vehicle.tesla.cybertruck")
+            blueprint.set_attribute("role_name", "hero")
+            self._spawn(blueprint, self.map.get_spawn_points()[0])
+            self.replay = None
+        snapshot = WorldSnapshot(self.frame, self.elapsed_seconds, delta_seconds)
+        self.snapshot = snapshot
+        for callback in list(self.callbacks.values()):
+            callback(snapshot)
+        for actor in list(self.actors.values()):
+            if isinstance(actor, Sensor):
+                actor._measure(snapshot)
+        return snapshot
+
+    # === Client API === #
+    def get_map(self) -> Map:
+        return self.map
+
+    def get_settings(self) -> WorldSettings:
+        return WorldSettings(
+            self.settings.no_rendering_mode, self.settings.synchronous_mode,
+            self.settings.fixed_delta_seconds
+        )
+
+    def apply_settings(self, settings: WorldSettings) -> int:
+        self.settings = settings
+        return self.frame
+
+    def set_weather(self, weather: WeatherParameters) -> None:
+        self.weather = weather
+
+    def get_weather(self) -> WeatherParameters:
+        return self.weather
+
+    def get_blueprint_library(self) -> BlueprintLibrary:
+        return BlueprintLibrary([blueprint.copy() for blueprint in self.blueprint_library])
+
+    def tick(self, seconds: float = 10.0) -> int:
+        return self._step().frame
+
+    def wait_for_tick(self, seconds: float = 10.0) -> WorldSnapshot:
+        return self._step()
+
+    def get_snapshot(self) -> WorldSnapshot:
+        return WorldSnapshot(self.frame, self.elapsed_seconds, 0.0)
+
+    def on_tick(self, callback: Callable[[WorldSnapshot], None]) -> int:
+        callback_id = next(self.callback_ids)
+        self.callbacks[callback_id] = callback
+        return callback_id
+
+    def remove_on_tick(self, callback_id: int) -> None:
+        self.callbacks.pop(callback_id, None)
+
+    def spawn_actor(
+        self,
+        blueprint: ActorBlueprint,
+        transform: Transform,
+        attach_to: Actor = None,
+        attachment_type: Any = None
+    ) -> Actor:
+        return self._spawn(blueprint, transform, attach_to)
+
+    def try_spawn_actor(self, *args, **kwargs) -> Actor:
+        return self.spawn_actor(*args, **kwargs)
+
+    def get_actor(self, actor_id: int) -> Actor:
+        return self.actors.get(actor_id)
+
+    def get_actors(self, actor_ids: List[int] = None) -> ActorList:
+        if actor_ids is None:
+            return ActorList(self.actors.values())
+        return ActorList([self.actors[i] for i in actor_ids if i in self.actors])
+
+    def get_random_location_from_navigation(self) -> Location:
+        return Location(x=float(np.random.uniform(0, 200)), y=float(np.random.uniform(0, 100)))
+
+    def set_pedestrians_seed(self, seed: int) -> None:
+        pass
+
+    def set_pedestrians_cross_factor(self, factor: float) -> None:
+        pass
+
+
+# === Client === #
+class _Server():
+    """Simulator state shared by clients of one endpoint.
+    """
+    def __init__(self) -> None:
+        self.world_ids = itertools.count(1)
+        self.actor_ids = itertools.count(1)
+        self.world = World(self, "Town10HD_Opt")
+        self.recording = None
+
+
+_servers: Dict[Tuple[str, int], _Server] = {}
+
+
+class TrafficManager():
+    """Traffic manager stand-in, accepting and ignoring settings.
+    """
+    def __init__(self, port: int) -> None:
+        self.port = port
+
+    def get_port(self) -> int:
+        return self.port
+
+    def __getattr__(self, name: str) -> Callable[..., None]:
+        return lambda *args, **kwargs: None
+
+
+class Client():
+    """Client stand-in, one simulated server per host and port.
+    """
+    def __init__(self, host: str = "localhost", port: int = 2000, worker_threads: int = 0) -> None:
+        self.server = _servers.setdefault((host, port), _Server())
+        self.timeout = 10.0
+
+    def set_timeout(self, seconds: float) -> None:
+        self.timeout = seconds
+
+    def get_server_version(self) -> str:
+        return "0.9.15-standin"
+
+    def get_client_version(self) -> str:
+        return "0.9.15-standin"
+
+    def get_available_maps(self) -> List[str]:
+        return ["/Game/Carla/Maps/Town%02d" % i for i in [1, 2, 3, 4, 5, 6, 7, 10]]
+
+    def load_world(self, map_name: str, reset_settings: bool = True) -> World:
+        settings = None if reset_settings else self.server.world.settings
+        self.server.world = World(self.server, map_name.split("/")[-1])
+        if settings is not None:
+            self.server.world.settings = settings
+        return self.server.world
+
+    def reload_world(self, reset_settings: bool = True) -> World:
+        return self.load_world(self.server.world.map.name, reset_settings)
+
+    def get_world(self) -> World:
+        return self.server.world
+
+    def get_trafficmanager(self, port: int = 8000) -> TrafficManager:
+        return TrafficManager(port)
+
+    def replay_file(
+        self,
+        name: str,
+        start: float,
+        duration: float,
+        follow_id: int,
+        replay_sensors: bool = False
+    ) -> str:
+        self.server.world.replay = (name, start, duration)
+        return "Replaying File: %s" % name
+
+    def start_recorder(self, filename: str, additional_data: bool = False) -> str:
+        self.server.recording = filename
+        with open(filename, "w") as record_file:
+            record_file.write("eCARLA stand-in recording\n")
+        return filename
+
+    def stop_recorder(self) -> None:
+        self.server.recording = None
+
+    def apply_batch(self, commands: List[Any], do_tick: bool = False) -> None:
+        self.apply_batch_sync(commands, do_tick)
+
+    def apply_batch_sync(self, commands: List[Any], do_tick: bool = False) -> List[Any]:
+        responses = [command._apply(self.server.world) for command in commands]
+        if do_tick:
+            self.server.world.tick()
+        return responses
+
+
+# === Commands === #
+class _Response():
+    """Batch command response stand-in.
+    """
+    def __init__(self, actor_id: int = 0, error: str = "") -> None:
+        self.actor_id = actor_id
+        self.error = error
+
+    def has_error(self) -> bool:
+        return bool(self.error)
+
+
+class _Command():
+    """Batch command stand-in.
+    """
+    def __init__(self) -> None:
+        self.next_commands = []
+
+    def then(self, command: "_Command") -> "_Command":
+        self.next_commands.append(command)
+        return self
+
+    def _run(self, world: World, future_id: int = 0) -> _Response:
+        return _Response()
+
+    def _apply(self, world: World, future_id: int = 0) -> _Response:
+        try:
+            response = self._run(world, future_id)
+        except Exception as error:
+            return _Response(error=str(error))
+        for command in self.next_commands:
+            command._apply(world, response.actor_id)
+        return response
+
+
+class _FutureActor():
+    """Placeholder for the actor spawned by the previous command.
+    """
+    pass
+
+
+class _SpawnActor(_Command):
+    def __init__(self, blueprint: ActorBlueprint, transform: Transform, parent: Any = None) -> None:
+        super().__init__()
+        self.blueprint = blueprint
+        self.transform = transform
+        self.parent = parent
+
+    def _run(self, world: World, future_id: int = 0) -> _Response:
+        parent = self.parent
+        if parent is not None and not isinstance(parent, Actor):
+            parent = world.get_actor(int(parent))
+            if parent is None:
+                raise RuntimeError("Parent actor not found.")
+        return _Response(actor_id=world._spawn(self.blueprint, self.transform, parent).id)
+
+
+class _DestroyActor(_Command):
+    def __init__(self, actor: Any) -> None:
+        super().__init__()
+        self.actor = actor
+
+    def _run(self, world: World, future_id: int = 0) -> _Response:
+        actor_id = self.actor.id if isinstance(self.actor, Actor) else int(self.actor)
+        actor = world.get_actor(actor_id)
+        if actor is None:
+            raise RuntimeError("Actor %d not found." % actor_id)
+        actor.destroy()
+        return _Response(actor_id=actor_id)
+
+
+class _SetAutopilot(_Command):
+    def __init__(self, actor: Any, enabled: bool, port: int = 8000) -> None:
+        super().__init__()
+        self.actor = actor
+
+    def _run(self, world: World, future_id: int = 0) -> _Response:
+        actor_id = future_id if self.actor is _FutureActor else int(self.actor)
+        return _Response(actor_id=actor_id)
+
+
+command = types.SimpleNamespace(
+    SpawnActor=_SpawnActor,
+    DestroyActor=_DestroyActor,
+    SetAutopilot=_SetAutopilot,
+    FutureActor=_FutureActor
+)
+
+
+# === Installation === #
+def install(
+    event_rate: float = 2e6,
+    tick_latency: float = 0.0,
+    num_frames: int = 8,
+    seed: int = 0
+) -> types.ModuleType:
+    """Registers the stand-in as the carla module, call before importing
+    the simulation modules.
+    """
+    _config.update({
+        "event_rate": event_rate,
+        "tick_latency": tick_latency,
+        "num_frames": num_frames,
+        "seed": seed
+    })
+    module = sys.modules[__name__]
+    sys.modules["carla"] = module
+    return module
@@ -0,0 +1,106 @@
+import time
+import threading
+from collections import OrderedDict
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+class FrameBuffer():
+    """Bounded sensor data buffer indexed by frame ID. When full, the oldest
+    frame is dropped.
+    """
+    def __init__(self, max_size: int = 16) -> None:
+        self.max_size = max_size
+        self._init_buffer()
+
+    def _init_buffer(self) -> None:
+        """Initializes buffer.
+        """
+        self.frames: OrderedDict = OrderedDict()
+        self.latest_frame = None
+        self.latest_timestamp = None
+        self.interval = None
+        self.misses = 0
+        self.evictions = 0
+        self.condition = threading.Condition()
+
+    def _evict_before(self, frame: int) -> None:
+        """Evicts frames older than the given frame.
+        """
+        while self.frames:
+            oldest_frame = next(iter(self.frames))
+            if oldest_frame >= frame:
+                break
+            del self.frames[oldest_frame]
+            self.evictions += 1
+
+    @staticmethod
+    def _get_timestamp(data: Any) -> float:
+        """Returns simulation timestamp of sensor data or world snapshot.
+        """
+        timestamp = data.timestamp
+        return getattr(timestamp, "elapsed_seconds", timestamp)
+
+    # === User Functions === #
+    def put(self, data: Any) -> None:
+        """Stores sensor data, used as sensor listener.
+        """
+        with self.condition:
+            self.frames[data.frame] = data
+            if self.latest_frame is None or data.frame > self.latest_frame:
+                self.latest_frame = data.frame
+                # Track measured capture interval
+                timestamp = self._get_timestamp(data)
+                if self.latest_timestamp is not None:
+                    self.interval = timestamp - self.latest_timestamp
+                self.latest_timestamp = timestamp
+            while len(self.frames) > self.max_size:
+                self.frames.popitem(last=False)
+                self.evictions += 1
+            self.condition.notify_all()
+
+    def get(self, frame: int, timeout: float = 2.0) -> Any:
+        """Returns sensor data of the given frame, or None on a miss.
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            # Wait unless the frame arrived or was already skipped over
+            while frame not in self.frames and (
+                self.latest_frame is None or self.latest_frame < frame
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0.0:
+                    break
+                self.condition.wait(remaining)
+            data = self.frames.pop(frame, None)
+            self._evict_before(frame)
+            if data is None:
+                self.misses += 1
+            return data
+
+    def poll(self, frame: int) -> Any:
+        """Returns sensor data of the given frame if already stored, without
+        waiting or counting a miss.
+        """
+        with self.condition:
+            data = self.frames.pop(frame, None)
+            self._evict_before(frame)
+            return data
+
+    def get_latest_timestamp(self) -> float:
+        """Returns simulation timestamp of the latest stored frame.
+        """
+        return self.latest_timestamp
+
+    def get_interval(self) -> float:
+        """Returns last measured capture interval.
+        """
+        return self.interval
+
+    def get_misses(self) -> int:
+        """Returns number of missed frames.
+        """
+        return self.misses
+
+    def __len__(self) -> int:
+        return len(self.frames)
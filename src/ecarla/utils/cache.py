@@ -0,0 +1,121 @@
+import os
+
+import carla
+
+from ewiz.core.utils import create_dir, save_json, read_json
+
+from .ready import get_map_name
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+class MapCache():
+    """Blueprint library, spawn points and filtered blueprint sets of a
+    single map, optionally persisted to disk.
+    """
+    def __init__(self, world: Any, cache_path: str = None) -> None:
+        self.world = world
+        self.cache_path = cache_path
+        self._init_cache()
+
+    def _init_cache(self) -> None:
+        """Initializes cache, loading persisted entries if available.
+        """
+        self.blueprint_library = None
+        self.map = None
+        self.spawn_points: List[Any] = None
+        self.blueprints: Dict[str, List[Any]] = {}
+        self.blueprint_ids: Dict[str, List[str]] = {}
+        if self.cache_path is not None and os.path.exists(self.cache_path):
+            cache = read_json(self.cache_path)
+            self.blueprint_ids = cache["blueprints"]
+            self.spawn_points = [
+                carla.Transform(
+                    carla.Location(x=x, y=y, z=z),
+                    carla.Rotation(pitch=pitch, yaw=yaw, roll=roll)
+                )
+                for x, y, z, pitch, yaw, roll in cache["spawn_points"]
+            ]
+
+    # === User Functions === #
+    def get_blueprint_library(self) -> Any:
+        """Returns blueprint library, fetched once.
+        """
+        if self.blueprint_library is None:
+            self.blueprint_library = self.world.get_blueprint_library()
+        return self.blueprint_library
+
+    def get_map(self) -> Any:
+        """Returns map, fetched once.
+        """
+        if self.map is None:
+            self.map = self.world.get_map()
+        return self.map
+
+    def get_spawn_points(self) -> List[Any]:
+        """Returns copy of spawn points, safe to shuffle.
+        """
+        if self.spawn_points is None:
+            self.spawn_points = self.get_map().get_spawn_points()
+            self.save()
+        return list(self.spawn_points)
+
+    def get_blueprints(
+        self,
+        key: str,
+        build: Callable[[Any], List[Any]]
+    ) -> List[Any]:
+        """Returns filtered blueprint set, built from the library once.
+        """
+        if key not in self.blueprints:
+            blueprint_library = self.get_blueprint_library()
+            if key in self.blueprint_ids:
+                self.blueprints[key] = [
+                    blueprint_library.find(bp_id) for bp_id in self.blueprint_ids[key]
+                ]
+            else:
+                self.blueprints[key] = list(build(blueprint_library))
+                self.blueprint_ids[key] = [bp.id for bp in self.blueprints[key]]
+                self.save()
+        return self.blueprints[key]
+
+    def save(self) -> None:
+        """Persists spawn points and blueprint sets.
+        """
+        if self.cache_path is None:
+            return
+        spawn_points = []
+        if self.spawn_points is not None:
+            spawn_points = [
+                [
+                    p.location.x, p.location.y, p.location.z,
+                    p.rotation.pitch, p.rotation.yaw, p.rotation.roll
+                ]
+                for p in self.spawn_points
+            ]
+        cache = {"spawn_points": spawn_points, "blueprints": self.blueprint_ids}
+        temp_path = self.cache_path + ".tmp"
+        save_json(cache, temp_path)
+        os.replace(temp_path, self.cache_path)
+
+
+# Session caches per server version and map
+_map_caches: Dict[Tuple[str, str], MapCache] = {}
+
+
+def get_map_cache(client: Any, world: Any, cache_dir: str = None) -> MapCache:
+    """Returns session cache of the world's map, shared across scenarios.
+    """
+    server_version = client.get_server_version()
+    map_name = get_map_name(world)
+    key = (server_version, map_name)
+    if key not in _map_caches:
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = os.path.join(
+                create_dir(cache_dir), "%s_%s.json" % (map_name, server_version)
+            )
+        _map_caches[key] = MapCache(world=world, cache_path=cache_path)
+    # Cached library and map stay valid across reloads of the same map
+    _map_caches[key].world = world
+    return _map_caches[key]
@@ -1,3 +1,5 @@
+import math
+
 import carla
 import pygame
 from pygame.locals import *
@@ -93,3 +95,111 @@ class ManualControl():
         """Quits PyGame on key stroke.
         """
         return (key == K_ESCAPE) or (key == K_q and pygame.key.get_mods() & KMOD_CTRL)
+
+
+class AutopilotControl():
+    """Traffic manager autopilot control, for runs without a driver.
+    """
+    def __init__(
+        self,
+        world: Any,
+        actor: Any,
+        traffic_manager: Any,
+        speed_difference: float = None
+    ) -> None:
+        self.world = world
+        self.actor = actor
+        self.traffic_manager = traffic_manager
+        self.speed_difference = speed_difference
+        self._init_control()
+
+    def _init_control(self) -> None:
+        """Hands actor over to the traffic manager.
+        """
+        self.actor.set_autopilot(True, self.traffic_manager.get_port())
+        if self.speed_difference is not None:
+            self.traffic_manager.vehicle_percentage_speed_difference(
+                self.actor, self.speed_difference
+            )
+
+    # === User Functions === #
+    def parse_control(self, clock: Any = None) -> bool:
+        """Traffic manager drives on ticks, never quits.
+        """
+        return False
+
+
+class RouteControl():
+    """Scripted control, steering the actor through a list of locations at a
+    target speed.
+    """
+    def __init__(
+        self,
+        world: Any,
+        actor: Any,
+        route: List[Any],
+        target_speed: float = 30.0,
+        reach_distance: float = 3.0,
+        max_steer_angle: float = 70.0,
+        loop: bool = False
+    ) -> None:
+        self.world = world
+        self.actor = actor
+        self.route = route
+        self.target_speed = target_speed
+        self.reach_distance = reach_distance
+        self.max_steer_angle = max_steer_angle
+        self.loop = loop
+        self._init_control()
+
+    def _init_control(self) -> None:
+        """Initializes control and route.
+        """
+        self.vehicle_control = carla.VehicleControl()
+        # Waypoints as (x, y), from locations, transforms or tuples
+        self.waypoints: List[Tuple[float, float]] = []
+        for point in self.route:
+            point = getattr(point, "location", point)
+            if hasattr(point, "x"):
+                self.waypoints.append((point.x, point.y))
+            else:
+                self.waypoints.append((point[0], point[1]))
+        self.index = 0
+
+    def _get_steer(self, transform: Any, target: Tuple[float, float]) -> float:
+        """Returns steering towards target.
+        """
+        heading = math.degrees(math.atan2(
+            target[1] - transform.location.y, target[0] - transform.location.x
+        ))
+        angle = (heading - transform.rotation.yaw + 180.0) % 360.0 - 180.0
+        return max(-1.0, min(1.0, angle/self.max_steer_angle))
+
+    # === User Functions === #
+    def parse_control(self, clock: Any = None) -> bool:
+        """Applies control towards the next waypoint, returns True once the
+        route is completed.
+        """
+        transform = self.actor.get_transform()
+        # Skip reached waypoints
+        while self.index < len(self.waypoints) and math.hypot(
+            self.waypoints[self.index][0] - transform.location.x,
+            self.waypoints[self.index][1] - transform.location.y
+        ) < self.reach_distance:
+            self.index += 1
+            if self.index == len(self.waypoints) and self.loop:
+                self.index = 0
+        if self.index >= len(self.waypoints):
+            self.vehicle_control.throttle = 0.0
+            self.vehicle_control.brake = 1.0
+            self.actor.apply_control(self.vehicle_control)
+            return True
+        # Proportional speed control in km/h
+        velocity = self.actor.get_velocity()
+        speed = 3.6*math.sqrt(velocity.x**2 + velocity.y**2 + velocity.z**2)
+        speed_error = (self.target_speed - speed)/max(self.target_speed, 1e-6)
+        self.vehicle_control.throttle = max(0.0, min(0.75, 2.0*speed_error))
+        self.vehicle_control.brake = max(0.0, min(1.0, -2.0*speed_error))
+        self.vehicle_control.steer = self._get_steer(transform, self.waypoints[self.index])
+        self.actor.apply_control(self.vehicle_control)
+        return False
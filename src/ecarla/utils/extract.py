@@ -1,30 +1,115 @@
 import numpy as np
 import flow_vis
 
-from typing import Any, Dict, List, Tuple, Callable
+from typing import Any, Dict, List, Tuple, Callable, NamedTuple, Union
+
+
+class LazyPreview():
+    """Preview image built on first use.
+    """
+    def __init__(self, builder: Callable[..., np.ndarray], *args) -> None:
+        self.builder = builder
+        self.args = args
+        self.image = None
+
+    def __call__(self) -> np.ndarray:
+        if self.image is None:
+            self.image = self.builder(*self.args)
+            self.args = None
+        return self.image
+
+
+# Preview image, or a callable building it on demand
+Preview = Union[np.ndarray, LazyPreview]
+
+
+# CARLA DVS event record layout
+EVENT_DTYPE = np.dtype([
+    ("x", np.uint16),
+    ("y", np.uint16),
+    ("t", np.int64),
+    ("pol", bool)
+])
+
+
+# Native DVS timestamps are in ns, dataset timestamps in us
+DVS_TIME_DIVISOR = 1000
+
+# Luminance weights in 16-bit fixed point, summing to 1 << 16
+GRAY_WEIGHTS_FIXED = (19595, 38470, 7471)
+
+
+class EventPacket(NamedTuple):
+    """Columnar events packet.
+    """
+    x: np.ndarray
+    y: np.ndarray
+    t: np.ndarray
+    pol: np.ndarray
+
+    def __len__(self) -> int:
+        return self.x.shape[0]
+
+
+def _events_surface(data: Any) -> np.ndarray:
+    """Builds events preview image, reading the sensor data kept alive by the
+    preview.
+    """
+    raw_data = np.frombuffer(data.raw_data, dtype=EVENT_DTYPE)
+    image = np.zeros((data.height, data.width, 3), dtype=np.uint8)
+    image[raw_data[:]["y"], raw_data[:]["x"], raw_data[:]["pol"]*2] = 255
+    return image
+
+
+def _gray_surface(gray: np.ndarray) -> np.ndarray:
+    """Builds grayscale preview image.
+    """
+    return np.repeat(gray[..., None], 3, axis=2)
+
+
+def _flow_surface(flow: np.ndarray) -> np.ndarray:
+    """Builds flow preview image.
+    """
+    return flow_vis.flow_to_color(
+        flow_uv=np.transpose(flow, (1, 2, 0)), convert_to_bgr=False
+    )
 
 
 def extract_events(
-    data: Any, sim_time: float
-) -> Tuple[np.ndarray, np.ndarray]:
+    data: Any, sim_time: float, packet: bool = False, native_time: bool = False
+) -> Tuple[Any, None, Preview]:
     """Extracts events data from simulation.
     """
-    raw_data = np.frombuffer(data.raw_data, dtype=([
-        ("x", np.uint16),
-        ("y", np.uint16),
-        ("t", np.int64),
-        ("pol", bool)
-    ]))
+    raw_data = np.frombuffer(data.raw_data, dtype=EVENT_DTYPE)
+    # Extract events timestamps
+    if native_time:
+        # Shift sensor timestamps so the measurement time maps to sim time
+        time_offset = int(round((sim_time - data.timestamp)*1e6))
+        time = raw_data["t"]//DVS_TIME_DIVISOR + time_offset
+        if time.shape[0] > 1 and np.any(time[1:] < time[:-1]):
+            order = np.argsort(time, kind="stable")
+            raw_data = raw_data[order]
+            time = time[order]
+    else:
+        time = np.full(raw_data.shape[0], int(round(sim_time*1e6)), dtype=np.int64)
     # Extract raw events
-    events = np.zeros((raw_data[:]["x"].shape[0], 4), dtype=np.float64)
-    events[:, 0] = raw_data[:]["x"]
-    events[:, 1] = raw_data[:]["y"]
-    events[:, 2] = sim_time*1e6
-    events[:, 3] = raw_data[:]["pol"]
-    events = events.astype(np.int64)
-    # Extract events image
-    image = np.zeros((data.height, data.width, 3), dtype=np.uint8)
-    image[raw_data[:]["y"], raw_data[:]["x"], raw_data[:]["pol"]*2] = 255
+    if packet:
+        # Columns are copied, the sensor buffer does not outlive its data
+        events = EventPacket(
+            x=raw_data["x"].copy(),
+            y=raw_data["y"].copy(),
+            t=time,
+            pol=raw_data["pol"].copy()
+        )
+    else:
+        events = np.zeros((raw_data[:]["x"].shape[0], 4), dtype=np.float64)
+        events[:, 0] = raw_data[:]["x"]
+        events[:, 1] = raw_data[:]["y"]
+        events[:, 2] = time
+        events[:, 3] = raw_data[:]["pol"]
+        events = events.astype(np.int64)
+    # Defer events image
+    image = LazyPreview(_events_surface, data)
     return events, None, image
 
 
@@ -40,43 +125,54 @@ def extract_rgb(
     rgb = rgb[:, :, :3]
     rgb = rgb[:, :, ::-1]
     # Extract simulation time
-    time = int(sim_time*1e6)
+    time = int(round(sim_time*1e6))
     return rgb, time, rgb
 
 
 def extract_gray(
-    data: Any, sim_time: float
-) -> Tuple[np.ndarray, int, np.ndarray]:
-    """Extracts grayscale image from simulation.
+    data: Any, sim_time: float, uint8: bool = False
+) -> Tuple[np.ndarray, int, Preview]:
+    """Extracts grayscale image from simulation. The writer stores uint8
+    images either way, uint8 only skips the float64 conversion per frame.
     """
     raw_data = np.frombuffer(data.raw_data, dtype=np.uint8)
-    # Extract RGB image
-    rgb = np.reshape(raw_data, (data.height, data.width, 4))
-    rgb = rgb[:, :, :3]
-    rgb = rgb[:, :, ::-1]
-    # Convert to grayscale image
-    gray = np.dot(rgb[..., :3], [0.299, 0.587, 0.114])
+    bgra = np.reshape(raw_data, (data.height, data.width, 4))
+    if uint8:
+        # Fixed-point conversion straight from BGRA channels
+        gray = np.empty((data.height, data.width), dtype=np.uint32)
+        np.multiply(bgra[:, :, 2], GRAY_WEIGHTS_FIXED[0], out=gray, dtype=np.uint32)
+        gray += np.multiply(bgra[:, :, 1], GRAY_WEIGHTS_FIXED[1], dtype=np.uint32)
+        gray += np.multiply(bgra[:, :, 0], GRAY_WEIGHTS_FIXED[2], dtype=np.uint32)
+        gray >>= 16
+        gray = gray.astype(np.uint8)
+    else:
+        # Extract RGB image
+        rgb = bgra[:, :, :3]
+        rgb = rgb[:, :, ::-1]
+        # Convert to grayscale image
+        gray = np.dot(rgb[..., :3], [0.299, 0.587, 0.114])
     # Extract simulation time
-    time = int(sim_time*1e6)
-    # Convert to surface
-    surface = np.repeat(gray[..., None], 3, axis=2)
+    time = int(round(sim_time*1e6))
+    # Defer surface conversion
+    surface = LazyPreview(_gray_surface, gray)
     return gray, time, surface
 
 
 def extract_flow(
-    data: Any, sim_time: float
-) -> Tuple[np.ndarray, int, np.ndarray]:
-    """Extracts flow data from simulation.
+    data: Any, sim_time: float, dtype: Any = np.float64
+) -> Tuple[np.ndarray, int, Preview]:
+    """Extracts flow data from simulation. The writer stores float64 flow
+    either way, float32 only saves memory during extraction.
     """
-    raw_data = np.array([(p.x, p.y) for p in data], dtype=np.float64)
-    # Extract optical flow
-    flow = raw_data.reshape((data.height, data.width, 2))
-    flow[:, :, 0] *= data.width*-0.5
-    flow[:, :, 1] *= data.height*0.5
-    # Convert to surface
-    surface = flow_vis.flow_to_color(flow_uv=flow, convert_to_bgr=False)
-    # Convert flow format
-    flow = np.transpose(flow, (2, 0, 1))
+    # Read raw flow buffer, two float32 components per pixel
+    raw_data = np.frombuffer(data.raw_data, dtype=np.float32)
+    raw_data = raw_data.reshape((data.height, data.width, 2))
+    # Extract optical flow, scaled directly into channel-first layout
+    flow = np.empty((2, data.height, data.width), dtype=dtype)
+    np.multiply(raw_data[:, :, 0], data.width*-0.5, out=flow[0], dtype=dtype)
+    np.multiply(raw_data[:, :, 1], data.height*0.5, out=flow[1], dtype=dtype)
+    # Defer surface conversion
+    surface = LazyPreview(_flow_surface, flow)
     # Extract simulation time
-    time = int(sim_time*1e6)
+    time = int(round(sim_time*1e6))
     return flow, time, surface
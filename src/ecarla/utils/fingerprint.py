@@ -0,0 +1,155 @@
+import os
+import json
+import shutil
+import hashlib
+
+from ewiz.core.utils import create_dir, save_json, read_json
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+# Output stamp file name
+STAMP_NAME = "fingerprint.json"
+# Reader arguments that do not change the written data
+VOLATILE_ARGS = [
+    "client_timeout", "init_timeout", "init_sleep", "tm_port", "headless",
+    "preview_fps", "cache_dir", "timeline_path", "summary_period", "pipelined", "pipeline_size",
+    "checkpoint_period", "resume", "events_chunk_size", "events_chunk_time"
+]
+
+
+def hash_file(file_path: str, chunk_size: int = 1 << 22) -> str:
+    """Returns SHA-256 digest of file contents.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as data_file:
+        for chunk in iter(lambda: data_file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_file_stat(file_path: str) -> List[int]:
+    """Returns file size and modification time, used to reuse hashes.
+    """
+    stat = os.stat(file_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def normalize(value: Any) -> Any:
+    """Converts arguments, including simulator transforms, to plain JSON
+    values with a stable layout.
+    """
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return round(value, 9)
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in sorted(value.items(), key=lambda i: str(i[0]))}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if hasattr(value, "location") and hasattr(value, "rotation"):
+        return {"location": normalize(value.location), "rotation": normalize(value.rotation)}
+    if all(hasattr(value, name) for name in ["x", "y", "z"]):
+        return [normalize(float(getattr(value, name))) for name in ["x", "y", "z"]]
+    if all(hasattr(value, name) for name in ["pitch", "yaw", "roll"]):
+        return [normalize(float(getattr(value, name))) for name in ["pitch", "yaw", "roll"]]
+    if hasattr(value, "item"):
+        # NumPy scalars
+        return normalize(value.item())
+    if isinstance(value, type):
+        return value.__module__ + "." + value.__name__
+    return str(value)
+
+
+def get_inputs(job: Dict[str, Any], reader_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns normalized conversion inputs of a job, without the recording.
+    """
+    reader_kwargs = {
+        name: value for name, value in reader_kwargs.items()
+        if name not in VOLATILE_ARGS
+    }
+    return normalize({
+        "world_map": job.get("world_map"),
+        "world_weather": job.get("world_weather"),
+        "window": job.get("window"),
+        "reader": reader_kwargs
+    })
+
+
+def read_stamp(out_path: str) -> Dict[str, Any]:
+    """Returns output stamp, None if missing or unreadable.
+    """
+    stamp_path = os.path.join(out_path, STAMP_NAME)
+    if not os.path.exists(stamp_path):
+        return None
+    try:
+        return read_json(stamp_path)
+    except (OSError, ValueError):
+        return None
+
+
+def write_stamp(out_path: str, stamp: Dict[str, Any], complete: bool) -> None:
+    """Writes output stamp, replacing the previous one atomically.
+    """
+    stamp = dict(stamp, complete=complete)
+    stamp_path = os.path.join(create_dir(out_path), STAMP_NAME)
+    save_json(stamp, stamp_path + ".tmp")
+    os.replace(stamp_path + ".tmp", stamp_path)
+
+
+def get_stamp(
+    record_path: str,
+    inputs: Dict[str, Any],
+    previous: Dict[str, Any] = None
+) -> Dict[str, Any]:
+    """Returns stamp fingerprinting the recording contents and inputs. The
+    recording hash of the previous stamp is reused if the file is unchanged.
+    """
+    record_stat = get_file_stat(record_path)
+    if previous is not None and previous.get("record_stat") == record_stat:
+        record_hash = previous["record_hash"]
+    else:
+        record_hash = hash_file(record_path)
+    fingerprint = hashlib.sha256(json.dumps(
+        {"record": record_hash, "inputs": inputs}, sort_keys=True
+    ).encode()).hexdigest()
+    return {
+        "fingerprint": fingerprint,
+        "record_hash": record_hash,
+        "record_stat": record_stat,
+        "inputs": inputs
+    }
+
+
+def is_output(dir_path: str) -> bool:
+    """Checks if directory holds conversion output.
+    """
+    return os.path.isdir(dir_path) and any(
+        os.path.exists(os.path.join(dir_path, name))
+        for name in [STAMP_NAME, "props.json", "events.hdf5"]
+    )
+
+
+def is_current(out_path: str, stamp: Dict[str, Any]) -> bool:
+    """Checks if output was completed from the same inputs.
+    """
+    previous = read_stamp(out_path)
+    return previous is not None and previous.get("complete", False) and (
+        previous.get("fingerprint") == stamp["fingerprint"]
+    )
+
+
+def complete_stamp(out_path: str, fingerprint: str) -> None:
+    """Marks output as complete if its stamp matches the fingerprint.
+    """
+    stamp = read_stamp(out_path)
+    if stamp is not None and stamp.get("fingerprint") == fingerprint:
+        write_stamp(out_path, stamp, complete=True)
+
+
+def remove_output(out_path: str) -> None:
+    """Removes stale or partial output.
+    """
+    if os.path.isdir(out_path):
+        print("Removing stale output:", out_path)
+        shutil.rmtree(out_path)
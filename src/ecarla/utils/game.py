@@ -1,16 +1,26 @@
+import time
+
 import pygame
 import numpy as np
 from datetime import timedelta
 
-from typing import Any, Dict, List, Tuple, Callable
+from typing import Any, Dict, List, Tuple, Callable, Union
 
 
 class Game():
     """PyGame window handler.
     """
-    def __init__(self, resolution: Tuple[int, int]) -> None:
+    def __init__(
+        self,
+        resolution: Tuple[int, int],
+        preview_fps: float = None,
+        blend_alpha: int = 100
+    ) -> None:
         self.resolution = resolution
+        self.preview_fps = preview_fps
+        self.blend_alpha = blend_alpha
         self._init_game()
+        self._init_preview()
 
     def _init_game(self) -> None:
         """Initializes PyGame window.
@@ -27,6 +37,14 @@ class Game():
         self.font = self.get_font()
         self.clock = pygame.time.Clock()
 
+    def _init_preview(self) -> None:
+        """Initializes preallocated preview buffers.
+        """
+        self.last_render = None
+        self.frame = np.zeros((self.resolution[0], self.resolution[1], 3), dtype=np.uint8)
+        self.blend_buffer = np.zeros(self.frame.shape, dtype=np.uint16)
+        self.layer_buffer = np.zeros(self.frame.shape, dtype=np.uint16)
+
     # === General Functions === #
     @staticmethod
     def get_font() -> pygame.font.Font:
@@ -69,16 +87,66 @@ class Game():
         self.clock.tick_busy_loop(fps)
 
     # === Rendering Functions === #
-    def render_image(self, image: np.ndarray, blend: bool = False) -> None:
-        """Renders image.
+    def render_image(
+        self,
+        image: Union[np.ndarray, Callable[[], np.ndarray]],
+        blend: bool = False
+    ) -> None:
+        """Renders image, building lazy previews on demand.
         """
+        if callable(image):
+            image = image()
+        # Direct copy needs a RGB integer image matching the display size
+        if not blend and image.shape == self.frame.shape:
+            pygame.surfarray.blit_array(
+                self.surface, image.astype(np.uint8, copy=False).swapaxes(0, 1)
+            )
+            return
         surf_data = pygame.surfarray.make_surface(
             image.swapaxes(0, 1)
         )
         if blend:
-            surf_data.set_alpha(100)
+            surf_data.set_alpha(self.blend_alpha)
         self.surface.blit(surf_data, (0, 0))
 
+    def should_render(self) -> bool:
+        """Checks if a preview frame is due at the target preview rate.
+        """
+        if self.preview_fps is None:
+            return True
+        now = time.perf_counter()
+        if self.last_render is not None and now - self.last_render < 1.0/self.preview_fps:
+            return False
+        self.last_render = now
+        return True
+
+    def render_layers(
+        self,
+        base: Union[np.ndarray, Callable[[], np.ndarray]] = None,
+        overlays: List[Union[np.ndarray, Callable[[], np.ndarray]]] = None
+    ) -> None:
+        """Composites base image and blended overlays in place, then draws
+        the result with a single copy to the display.
+        """
+        if base is None:
+            self.frame.fill(0)
+        else:
+            np.copyto(self.frame, base() if callable(base) else base, casting="unsafe")
+        overlays = [] if overlays is None else overlays
+        for overlay in overlays:
+            overlay = overlay() if callable(overlay) else overlay
+            # frame = (frame*(255 - alpha) + overlay*alpha)/255
+            np.multiply(
+                self.frame, 255 - self.blend_alpha,
+                out=self.blend_buffer, dtype=np.uint16
+            )
+            np.copyto(self.layer_buffer, overlay, casting="unsafe")
+            self.layer_buffer *= self.blend_alpha
+            self.blend_buffer += self.layer_buffer
+            self.blend_buffer //= 255
+            np.copyto(self.frame, self.blend_buffer, casting="unsafe")
+        pygame.surfarray.blit_array(self.surface, self.frame.swapaxes(0, 1))
+
     def render_sim_time(self, time: float) -> None:
         """Renders simulation time.
         """
@@ -105,3 +173,83 @@ class Game():
                 if event.key == pygame.K_ESCAPE:
                     return True
         return False
+
+
+class HeadlessGame(Game):
+    """Window-less stand-in for the PyGame handler, rendering is a no-op.
+    """
+    def _init_game(self) -> None:
+        """Skips PyGame initialization.
+        """
+        self.surface = None
+        self.font = None
+        self.clock = None
+
+    def _init_preview(self) -> None:
+        """Skips preview buffers allocation.
+        """
+        self.last_render = None
+
+    # === General Functions === #
+    @staticmethod
+    def flip() -> None:
+        """Does nothing without display.
+        """
+        pass
+
+    @staticmethod
+    def quit() -> None:
+        """Does nothing without display.
+        """
+        pass
+
+    # === Clock Functions === #
+    def tick_clock(self) -> None:
+        """Does nothing without clock.
+        """
+        pass
+
+    def tick_clock_busy_loop(self, fps: int = 60) -> None:
+        """Does nothing without clock.
+        """
+        pass
+
+    # === Rendering Functions === #
+    def render_image(
+        self,
+        image: Union[np.ndarray, Callable[[], np.ndarray]],
+        blend: bool = False
+    ) -> None:
+        """Does nothing without display, lazy previews are never built.
+        """
+        pass
+
+    def should_render(self) -> bool:
+        """Never renders without display.
+        """
+        return False
+
+    def render_layers(
+        self,
+        base: Union[np.ndarray, Callable[[], np.ndarray]] = None,
+        overlays: List[Union[np.ndarray, Callable[[], np.ndarray]]] = None
+    ) -> None:
+        """Does nothing without display.
+        """
+        pass
+
+    def render_sim_time(self, time: float) -> None:
+        """Does nothing without display.
+        """
+        pass
+
+    def render_text(self, text: str) -> None:
+        """Does nothing without display.
+        """
+        pass
+
+    # === Quit Function === #
+    def should_quit(self) -> bool:
+        """Never quits without window events.
+        """
+        return False
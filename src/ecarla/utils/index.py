@@ -0,0 +1,211 @@
+import threading
+
+import h5py
+import numpy as np
+
+from .extract import EventPacket
+
+from typing import Any, Dict, List, Tuple, Callable, Union
+
+
+def _get_size(data_file: h5py.File, name: str) -> int:
+    """Returns length of dataset, zero if missing.
+    """
+    return data_file[name].shape[0] if name in data_file else 0
+
+
+def _count_valid(
+    data_file: h5py.File,
+    name: str,
+    max_entries: int,
+    max_value: int
+) -> int:
+    """Returns number of leading index entries below max value.
+    """
+    if name not in data_file:
+        return 0
+    values = data_file[name][:max_entries]
+    return int(np.searchsorted(values, max_value, side="left"))
+
+
+def _truncate_index(data_file: h5py.File, name: str, size: int) -> None:
+    """Truncates index dataset to size.
+    """
+    if name in data_file and data_file[name].shape[0] > size:
+        data_file[name].resize(size, axis=0)
+
+
+class IndexBuilder():
+    """Incremental builder of time to events, time to frames and frames to
+    events indices, updated as data is written.
+    """
+    def __init__(
+        self,
+        events_writer: Any,
+        frame_writers: Dict[str, Tuple[Any, h5py.File]]
+    ) -> None:
+        self.events_writer = events_writer
+        self.frame_writers = frame_writers
+        self.compressor = events_writer.compressor
+        self._init_index()
+
+    def _init_index(self) -> None:
+        """Initializes index state.
+        """
+        self.lock = threading.Lock()
+        self.events_file: h5py.File = self.events_writer.events_file
+        self.num_events = 0
+        self.events_offset = None
+        self.last_event = None
+        self.num_time_to_events = 0
+        self.frames: Dict[str, Dict[str, Any]] = {
+            name: {"times": [], "to_events": 0, "time_to": 0}
+            for name in self.frame_writers.keys()
+        }
+
+    def _append(self, data_file: h5py.File, name: str, values: np.ndarray) -> None:
+        """Appends values to index dataset, creating it if needed.
+        """
+        if values.shape[0] == 0:
+            return
+        values = values.astype(np.int64)
+        if name not in data_file:
+            data_file.create_dataset(
+                name=name, data=values,
+                chunks=True, maxshape=(None,), dtype=np.int64,
+                **self.compressor
+            )
+        else:
+            data_points = data_file[name].shape[0]
+            data_file[name].resize(data_points + values.shape[0], axis=0)
+            data_file[name][data_points:] = values
+
+    def _search_events(self, time: int) -> int:
+        """Returns index of first written event at or after absolute time.
+        """
+        time = time - self.events_offset
+        if time <= 0:
+            return 0
+        # Search within the millisecond bucket only
+        bucket = int(time//1000)
+        time_to_events = self.events_file["time_to_events"]
+        start = int(time_to_events[bucket])
+        end = self.num_events
+        if bucket + 1 < time_to_events.shape[0]:
+            end = int(time_to_events[bucket + 1])
+        events_time = self.events_writer.events_time[start:end]
+        return start + int(np.searchsorted(events_time, time, side="left"))
+
+    def _update_frames(self, name: str, final: bool = False) -> None:
+        """Appends frame index entries that can no longer change.
+        """
+        if self.events_offset is None:
+            return
+        frame = self.frames[name]
+        data_file = self.frame_writers[name][1]
+        times = frame["times"]
+
+        # Frames to events, once events reach the frame time
+        to_events = []
+        while frame["to_events"] + len(to_events) < len(times):
+            time = times[frame["to_events"] + len(to_events)]
+            if time <= self.events_offset + self.last_event:
+                to_events.append(self._search_events(time))
+            elif final:
+                # Frames past the last event point to it
+                to_events.append(self.num_events - 1)
+            else:
+                break
+        self._append(data_file, name + "_to_events", np.array(to_events))
+        frame["to_events"] += len(to_events)
+
+        # Time to frames, once a later frame arrived
+        start = frame["time_to"]
+        end = self.num_time_to_events
+        if len(times) == 0 or start >= end:
+            return
+        thresholds = 1000*np.arange(start, end, dtype=np.int64) + self.events_offset
+        values = np.searchsorted(times, thresholds, side="right")
+        if not final:
+            values = values[values < len(times)]
+        self._append(data_file, "time_to_" + name, values)
+        frame["time_to"] += values.shape[0]
+
+    # === User Functions === #
+    def add_events(self, events: Union[np.ndarray, EventPacket]) -> None:
+        """Indexes events packet after it was written.
+        """
+        events_time = events.t if isinstance(events, EventPacket) else events[:, 2]
+        if len(events_time) == 0:
+            return
+        with self.lock:
+            if self.events_offset is None:
+                self.events_offset = int(self.events_writer.time_offset)
+            events_time = np.asarray(events_time, dtype=np.int64) - self.events_offset
+
+            # Millisecond buckets starting within this packet
+            end = int(events_time[-1]//1000) + 1
+            buckets = 1000*np.arange(self.num_time_to_events, end, dtype=np.int64)
+            indices = self.num_events + np.searchsorted(events_time, buckets, side="left")
+            self._append(self.events_file, "time_to_events", indices)
+            self.num_time_to_events = max(end, self.num_time_to_events)
+            self.num_events += events_time.shape[0]
+            self.last_event = int(events_time[-1])
+            for name in self.frames.keys():
+                self._update_frames(name)
+
+    def add_frame(self, name: str, time: int) -> None:
+        """Indexes frame after it was written.
+        """
+        with self.lock:
+            self.frames[name]["times"].append(int(time))
+            self._update_frames(name)
+
+    def resume(self) -> None:
+        """Drops index entries referring to data truncated on resume.
+        """
+        with self.lock:
+            self.num_events = self.events_writer.get_size()
+            if self.num_events == 0:
+                _truncate_index(self.events_file, "time_to_events", 0)
+            else:
+                self.events_offset = int(self.events_writer.time_offset)
+                self.last_event = int(self.events_writer.events_time[-1])
+                self.num_time_to_events = min(
+                    self.last_event//1000 + 1,
+                    _get_size(self.events_file, "time_to_events")
+                )
+                _truncate_index(self.events_file, "time_to_events", self.num_time_to_events)
+            for name, (writer, data_file) in self.frame_writers.items():
+                frame = self.frames[name]
+                num_frames = writer.get_size()
+                frame["times"] = []
+                if num_frames > 0:
+                    frame["times"] = [
+                        int(time) + int(writer.time_offset) for time in data_file["time"][:]
+                    ]
+                # Keep entries not depending on truncated data
+                frame["to_events"] = _count_valid(
+                    data_file, name + "_to_events", num_frames, self.num_events
+                )
+                _truncate_index(data_file, name + "_to_events", frame["to_events"])
+                frame["time_to"] = _count_valid(
+                    data_file, "time_to_" + name, self.num_time_to_events, num_frames
+                )
+                _truncate_index(data_file, "time_to_" + name, frame["time_to"])
+                self._update_frames(name)
+
+    def finalize(self) -> None:
+        """Completes indices with entries waiting for later data.
+        """
+        with self.lock:
+            if self.events_offset is None:
+                return
+            # Last bucket is only mapped if it starts before the last event
+            self.num_time_to_events = int(np.ceil(self.last_event/1000))
+            _truncate_index(self.events_file, "time_to_events", self.num_time_to_events)
+            for name in self.frames.keys():
+                frame = self.frames[name]
+                frame["time_to"] = min(frame["time_to"], self.num_time_to_events)
+                _truncate_index(self.frame_writers[name][1], "time_to_" + name, frame["time_to"])
+                self._update_frames(name, final=True)
@@ -0,0 +1,22 @@
+import os
+import sys
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+def get_memory_usage() -> int:
+    """Returns resident memory of the current process in bytes.
+    """
+    # Current resident size, cheap to read on Linux
+    try:
+        with open("/proc/self/statm", "r") as statm_file:
+            return int(statm_file.read().split()[1])*os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    # Fall back to peak resident size elsewhere
+    try:
+        import resource
+    except ImportError:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss*1024
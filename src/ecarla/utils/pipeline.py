@@ -0,0 +1,93 @@
+import queue
+import threading
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+class SensorPipeline():
+    """Threaded sensor data pipeline, one ordered worker per stream.
+    """
+    def __init__(
+        self,
+        stages: Dict[str, Callable[..., None]],
+        max_size: int = 8
+    ) -> None:
+        self.stages = stages
+        self.max_size = max_size
+        self._init_workers()
+
+    def _init_workers(self) -> None:
+        """Initializes workers and their bounded queues.
+        """
+        self.queues: Dict[str, queue.Queue] = {}
+        self.workers: Dict[str, threading.Thread] = {}
+        self.errors: List[Exception] = []
+        for name, stage in self.stages.items():
+            self.queues[name] = queue.Queue(maxsize=self.max_size)
+            self.workers[name] = threading.Thread(
+                target=self._work, args=(stage, self.queues[name]),
+                name="pipeline-" + name, daemon=True
+            )
+            self.workers[name].start()
+
+    def _work(self, stage: Callable[..., None], work_queue: queue.Queue) -> None:
+        """Runs stage on queued items in arrival order.
+        """
+        while True:
+            item = work_queue.get()
+            try:
+                if item is None:
+                    return
+                # Keep draining after a failure so producers never block
+                if not self.errors:
+                    stage(*item)
+            except Exception as error:
+                self.errors.append(error)
+            finally:
+                work_queue.task_done()
+
+    def _raise_errors(self) -> None:
+        """Raises first worker error.
+        """
+        if self.errors:
+            raise self.errors[0]
+
+    # === User Functions === #
+    def put(self, name: str, *args) -> None:
+        """Queues stage arguments, blocking while the stream is full.
+        """
+        self._raise_errors()
+        self.queues[name].put(args)
+
+    def flush(self) -> None:
+        """Waits until all queued items are processed.
+        """
+        for q in self.queues.values():
+            q.join()
+        self._raise_errors()
+
+    def get_depths(self) -> Dict[str, int]:
+        """Returns queue depth per stream.
+        """
+        return {name: q.qsize() for name, q in self.queues.items()}
+
+    def close(self) -> None:
+        """Drains queues and stops workers.
+        """
+        for name, worker in self.workers.items():
+            if worker.is_alive():
+                self.queues[name].put(None)
+        for worker in self.workers.values():
+            worker.join()
+        self._raise_errors()
+
+    # === Iterator Functions === #
+    def __enter__(self) -> "SensorPipeline":
+        """Initializes iterator.
+        """
+        return self
+
+    def __exit__(self, *args, **kwargs) -> None:
+        """Runs on exit.
+        """
+        self.close()
@@ -0,0 +1,147 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from typing import Any, Dict, List, Tuple, Callable, Iterator
+
+
+class Profiler():
+    """Per-tick stage timing recorder with rate-limited progress summary.
+    Stages run on pipeline workers are aggregated apart from ticks.
+    """
+    def __init__(
+        self,
+        timeline_path: str = None,
+        summary_period: float = 5.0
+    ) -> None:
+        self.timeline_path = timeline_path
+        self.summary_period = summary_period
+        self._init_profiler()
+
+    def _init_profiler(self) -> None:
+        """Initializes profiler.
+        """
+        self.lock = threading.Lock()
+        self.record: Dict[str, float] = {}
+        self.window: Dict[str, float] = {}
+        self.window_ticks = 0
+        self.total_ticks = 0
+        # Worker stages as total duration and item count
+        self.workers: Dict[str, List[float]] = {}
+        self.start_time = time.perf_counter()
+        self.summary_time = self.start_time
+        self.timeline_file = None
+        if self.timeline_path is not None:
+            self.timeline_file = open(self.timeline_path, "w")
+
+    def _print_summary(
+        self,
+        now: float,
+        frame: int,
+        sim_time: float,
+        info: Callable[[], Dict[str, Any]] = None
+    ) -> None:
+        """Prints progress and mean stage durations since last summary.
+        """
+        window_time = max(now - self.summary_time, 1e-9)
+        print(
+            "===== Frame ID: %s | Sim Time: %s | Real Time: %s | %.1f ticks/s =====" % (
+                frame, str(timedelta(seconds=sim_time)),
+                str(timedelta(seconds=now - self.start_time)),
+                self.window_ticks/window_time
+            )
+        )
+        if self.window_ticks > 0:
+            print("Stages (ms/tick):", ", ".join(
+                "%s %.3f" % (stage, 1e3*duration/self.window_ticks)
+                for stage, duration in self.window.items()
+            ))
+        with self.lock:
+            workers, self.workers = self.workers, {}
+        if workers:
+            print("Workers (ms/item):", ", ".join(
+                "%s %.3f" % (stage, 1e3*duration/count)
+                for stage, (duration, count) in workers.items()
+            ))
+        if info is not None:
+            for name, value in info().items():
+                print(name + ":", value)
+
+    # === User Functions === #
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Measures duration of stage within the current tick.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage: str, duration: float) -> None:
+        """Adds stage duration to the current tick.
+        """
+        with self.lock:
+            self.record[stage] = self.record.get(stage, 0.0) + duration
+
+    @contextmanager
+    def measure_worker(self, stage: str, sim_time: float) -> Iterator[None]:
+        """Measures duration of stage run on a worker for data of given time.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_worker(stage, time.perf_counter() - start, sim_time)
+
+    def add_worker(self, stage: str, duration: float, sim_time: float) -> None:
+        """Adds worker stage duration, kept apart from the current tick.
+        """
+        with self.lock:
+            aggregate = self.workers.setdefault(stage, [0.0, 0])
+            aggregate[0] += duration
+            aggregate[1] += 1
+            # Worker lines are tagged with the time of their data
+            if self.timeline_file is not None:
+                line = {"worker": stage, "sim_time": round(sim_time, 6), "duration": round(duration, 6)}
+                self.timeline_file.write(json.dumps(line) + "\n")
+
+    def end_tick(
+        self,
+        frame: int,
+        sim_time: float,
+        info: Callable[[], Dict[str, Any]] = None
+    ) -> None:
+        """Closes current tick record, info is only evaluated on summaries.
+        """
+        with self.lock:
+            record, self.record = self.record, {}
+        for stage, duration in record.items():
+            self.window[stage] = self.window.get(stage, 0.0) + duration
+        self.window_ticks += 1
+        self.total_ticks += 1
+
+        # Write timeline
+        if self.timeline_file is not None:
+            line = {"frame": frame, "sim_time": round(sim_time, 6)}
+            line.update({stage: round(duration, 6) for stage, duration in record.items()})
+            with self.lock:
+                self.timeline_file.write(json.dumps(line) + "\n")
+
+        # Print summary
+        now = time.perf_counter()
+        if self.summary_period is not None and now - self.summary_time >= self.summary_period:
+            self._print_summary(now, frame, sim_time, info)
+            self.window = {}
+            self.window_ticks = 0
+            self.summary_time = now
+
+    def close(self) -> None:
+        """Closes timeline file.
+        """
+        with self.lock:
+            if self.timeline_file is not None:
+                self.timeline_file.close()
+                self.timeline_file = None
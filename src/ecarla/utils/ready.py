@@ -0,0 +1,32 @@
+import time
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+def wait_until(
+    condition: Callable[[], Any],
+    timeout: float,
+    message: str,
+    period: float = 0.05
+) -> Any:
+    """Polls condition until it returns a truthy value, which is returned.
+    Raises an error once the deadline passes.
+    """
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            result = condition()
+        except RuntimeError:
+            # Server may refuse requests while loading
+            result = None
+        if result:
+            return result
+        if time.perf_counter() >= deadline:
+            raise RuntimeError("Timed out after %.1f s: %s" % (timeout, message))
+        time.sleep(period)
+
+
+def get_map_name(world: Any) -> str:
+    """Returns map name of world without its package path.
+    """
+    return world.get_map().name.split("/")[-1]
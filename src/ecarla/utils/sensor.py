@@ -1,5 +1,6 @@
-import queue
-from queue import Empty
+import carla
+
+from .buffer import FrameBuffer
 
 from typing import Any, Dict, List, Tuple, Callable
 
@@ -12,7 +13,9 @@ class Sensor():
         world: Any,
         actor: Any,
         sensor: Dict[str, Any],
-        delta_time: float = 0.1
+        delta_time: float = 0.1,
+        blueprint_library: Any = None,
+        spawn: bool = True
     ) -> None:
         self.world = world
         self.actor = actor
@@ -20,8 +23,14 @@ class Sensor():
         self.delta_time = delta_time
 
         # Sensor attributes
-        self.world_bp = self.world.get_blueprint_library()
+        self.world_bp = blueprint_library
+        if self.world_bp is None:
+            self.world_bp = self.world.get_blueprint_library()
         self._init_sensor()
+        if spawn:
+            self.set_obj(self.world.spawn_actor(
+                self.sensor_bp, self.transform, attach_to=self.actor
+            ))
 
     def _init_sensor(self) -> None:
         """Initializes sensor.
@@ -34,36 +43,23 @@ class Sensor():
         self.converter: Any = self.sensor["converter"]
 
         # Sensor synchronization
-        self.sync_flag = False
-        self.frame_count = 1
-        if "sensor_tick" in self.options.keys():
-            self.parsing_freq = int(float(self.options["sensor_tick"])/self.delta_time)
-        else:
-            self.parsing_freq = 1
-
-        # Spawn sensor
-        self.sensor_obj = self.world_bp.find(self.type)
+        self.sensor_tick = float(self.options.get("sensor_tick", 0.0))
+
+        # Sensor blueprint
+        self.sensor_bp = self.world_bp.find(self.type)
         for option in self.options.keys():
-            self.sensor_obj.set_attribute(option, self.options[option])
-        self.sensor_obj = self.world.spawn_actor(
-            self.sensor_obj, self.transform, attach_to=self.actor
-        )
+            self.sensor_bp.set_attribute(option, self.options[option])
+        self.sensor_obj = None
 
     def _parse_data(
         self,
         world_frame: Any,
-        sensor_queue: queue.Queue,
+        sensor_buffer: FrameBuffer,
         timeout: float = 2.0
     ) -> Any:
         """Parses sensor data.
         """
-        while True:
-            try:
-                data = sensor_queue.get(timeout=timeout)
-                if data.frame == world_frame:
-                    return data
-            except Empty:
-                return None
+        return sensor_buffer.get(world_frame, timeout=timeout)
 
     # === User Functions === #
     def get_name(self) -> str:
@@ -76,22 +72,72 @@ class Sensor():
         """
         return self.sensor_obj
 
+    def set_obj(self, sensor_obj: Any) -> None:
+        """Sets spawned sensor object.
+        """
+        self.sensor_obj = sensor_obj
+
+    def get_spawn_command(self) -> Any:
+        """Returns batch command spawning the sensor on its actor.
+        """
+        return carla.command.SpawnActor(self.sensor_bp, self.transform, self.actor.id)
+
+    def is_due(self, elapsed_time: float, sensor_buffer: FrameBuffer) -> bool:
+        """Checks if sensor data is expected at the given simulation time.
+        """
+        last_time = sensor_buffer.get_latest_timestamp()
+        if self.sensor_tick <= 0.0 or last_time is None:
+            return True
+        # Prefer measured capture interval over configured sensor tick
+        interval = sensor_buffer.get_interval()
+        if interval is None or interval <= 0.0:
+            interval = self.sensor_tick
+        return elapsed_time - last_time >= interval - 0.5*self.delta_time
+
     def read_data(
         self,
         world_frame: Any,
-        sensor_queue: queue.Queue,
+        sensor_buffer: FrameBuffer,
+        elapsed_time: float,
         timeout: float = 2.0
     ) -> Any:
         """User sensor data reading function.
         """
-        data = None
-        if self.sync_flag == False:
-            data = self._parse_data(world_frame, sensor_queue, timeout)
-            if data is not None:
-                self.sync_flag = True
-                self.frame_count = 1
-        else:
-            if self.frame_count % self.parsing_freq == 0:
-                data = self._parse_data(world_frame, sensor_queue, timeout)
-            self.frame_count += 1
-        return data
+        if self.is_due(elapsed_time, sensor_buffer):
+            return self._parse_data(world_frame, sensor_buffer, timeout)
+        return sensor_buffer.poll(world_frame)
+
+
+def spawn_sensors(
+    client: Any,
+    world: Any,
+    actor: Any,
+    sensors: List[Dict[str, Any]],
+    delta_time: float = 0.1,
+    blueprint_library: Any = None
+) -> List[Sensor]:
+    """Spawns sensor rig on actor in a single batch.
+    """
+    if blueprint_library is None:
+        blueprint_library = world.get_blueprint_library()
+    active_sensors = [
+        Sensor(
+            world=world, actor=actor, sensor=sensor, delta_time=delta_time,
+            blueprint_library=blueprint_library, spawn=False
+        )
+        for sensor in sensors
+    ]
+    responses = client.apply_batch_sync(
+        [sensor.get_spawn_command() for sensor in active_sensors], False
+    )
+    errors = [response.error for response in responses if response.error]
+    sensor_ids = [response.actor_id for response in responses if not response.error]
+    if errors:
+        client.apply_batch([carla.command.DestroyActor(x) for x in sensor_ids])
+        raise RuntimeError("Sensor spawn error: " + "; ".join(errors))
+    sensor_objs = {
+        sensor_obj.id: sensor_obj for sensor_obj in world.get_actors(sensor_ids)
+    }
+    for sensor, sensor_id in zip(active_sensors, sensor_ids):
+        sensor.set_obj(sensor_objs[sensor_id])
+    return active_sensors
@@ -5,6 +5,8 @@ import numpy as np
 import time
 import random
 
+from .cache import MapCache, get_map_cache
+
 from typing import Any, Dict, List, Tuple, Callable
 
 
@@ -12,10 +14,12 @@ from typing import Any, Dict, List, Tuple, Callable
 class VehicleSpawner():
     """Vehicle spawner.
     """
-    def __init__(self, client: Any, world: Any) -> None:
+    def __init__(self, client: Any, world: Any, map_cache: MapCache = None) -> None:
         self.client = client
         self.world = world
-        self.map = self.world.get_map()
+        self.map_cache = map_cache
+        if self.map_cache is None:
+            self.map_cache = get_map_cache(client, world)
         self.settings = self.world.get_settings()
 
         # All available vehicles in the simulation
@@ -46,16 +50,17 @@ class VehicleSpawner():
                 "Only 1 vehicle can be spawned when choosing vehicle type."
             )
         if vehicle_type is None:
-            self.world_bp_vehicles = (self.world.get_blueprint_library().filter("vehicle.*"))
-        else:
-            self.world_bp_vehicles = [self.world.get_blueprint_library().find(vehicle_type)]
-        self.world_bp_vehicles = [
-            v for v in self.world_bp_vehicles
-            if int(v.get_attribute("number_of_wheels")) == 4
-        ]
+            vehicle_type = "vehicle.*"
+        self.world_bp_vehicles = self.map_cache.get_blueprints(
+            vehicle_type + ":4-wheels",
+            lambda bp_lib: [
+                v for v in bp_lib.filter(vehicle_type)
+                if int(v.get_attribute("number_of_wheels")) == 4
+            ]
+        )
 
         # Spawn vehicles
-        self.spawn_points = self.map.get_spawn_points()
+        self.spawn_points = self.map_cache.get_spawn_points()
         self.num_spawns = len(self.spawn_points)
         if num_vehicles < self.num_spawns:
             np.random.shuffle(self.spawn_points)
@@ -88,14 +93,21 @@ class TrafficSpawner():
         client: Any,
         world: Any,
         num_vehicles: int = 20,
-        num_peds: int = 30
+        num_peds: int = 30,
+        map_cache: MapCache = None,
+        tm_port: int = 8000,
+        seed: int = None
     ) -> None:
         self.client = client
         self.world = world
-        self.map = self.world.get_map()
+        self.map_cache = map_cache
+        if self.map_cache is None:
+            self.map_cache = get_map_cache(client, world)
         self.settings = self.world.get_settings()
         self.num_vehicles = num_vehicles
         self.num_peds = num_peds
+        self.tm_port = tm_port
+        self.seed = seed
 
         # All available traffic in the simulation
         self.all_traffic = []
@@ -106,16 +118,24 @@ class TrafficSpawner():
         self.future_actor = carla.command.FutureActor
 
         # Spawn traffic
-        self._init_traffic_manager()
+        self._init_traffic_manager(seed=self.seed)
         if num_vehicles is not None:
             self.spawn_vehicles(num_vehicles)
         if num_peds is not None:
-            self.spawn_walkers(num_peds)
+            self.spawn_walkers(num_peds, seed=self.seed)
 
     def _get_bp_lib(self, filter: str, generation: str) -> List:
-        """Gets blueprint library.
+        """Gets blueprint library, filtered once per map.
+        """
+        return self.map_cache.get_blueprints(
+            filter + ":generation-" + generation,
+            lambda bp_lib: self._filter_bp_lib(bp_lib, filter, generation)
+        )
+
+    def _filter_bp_lib(self, bp_lib: Any, filter: str, generation: str) -> List:
+        """Filters blueprint library.
         """
-        all_bps = self.world.get_blueprint_library().filter(filter)
+        all_bps = bp_lib.filter(filter)
         if generation.lower() == "all":
             return all_bps
         if len(all_bps) == 1:
@@ -135,9 +155,9 @@ class TrafficSpawner():
     def _init_traffic_manager(self, seed: int = None) -> None:
         """Initializes traffic manager.
         """
-        self.traffic_manager = self.client.get_trafficmanager(8000)
+        self.traffic_manager = self.client.get_trafficmanager(self.tm_port)
         self.traffic_manager.set_global_distance_to_leading_vehicle(2.5)
-        if seed:
+        if seed is not None:
             self.traffic_manager.set_random_device_seed(seed)
         self.traffic_manager.set_synchronous_mode(True)
         self.traffic_manager.global_percentage_speed_difference(30.0)
@@ -155,7 +175,7 @@ class TrafficSpawner():
             self.client.apply_batch([carla.command.DestroyActor(x) for x in self.all_ids])
         print("All traffic destroyed.")
 
-    def spawn_walkers(self, num_walkers: int = 10, seed: int = 0) -> None:
+    def spawn_walkers(self, num_walkers: int = 10, seed: int = None) -> None:
         """Spawns walkers.
         """
         # Walker settings
@@ -164,7 +184,7 @@ class TrafficSpawner():
         walker_bps = self._get_bp_lib(filter="walker.pedestrian.*", generation="2")
         percent_peds_running = 0.0
         percent_peds_crossing = 0.0
-        if seed:
+        if seed is not None:
             self.world.set_pedestrians_seed(seed)
             random.seed(seed)
 
@@ -209,7 +229,7 @@ class TrafficSpawner():
 
         # Spawn walkers controller
         controllers_batch = []
-        walker_control_bp = self.world.get_blueprint_library().find("controller.ai.walker")
+        walker_control_bp = self.map_cache.get_blueprint_library().find("controller.ai.walker")
         for i in range(len(self.all_walkers)):
             controllers_batch.append(self.spawn_actor(
                 walker_control_bp, carla.Transform(), self.all_walkers[i]["walker_id"]
@@ -240,13 +260,14 @@ class TrafficSpawner():
         """Spawns vehicles.
         """
         self.all_vehicles = []
-        vehicle_bps = self._get_bp_lib(filter="vehicle.*", generation="2")
-        vehicle_bps = [
-            v for v in vehicle_bps
-            if int(v.get_attribute("number_of_wheels")) == 4
-        ]
-        vehicle_bps = sorted(vehicle_bps, key=(lambda vehicle_bp: vehicle_bp.id))
-        spawn_points = self.map.get_spawn_points()
+        vehicle_bps = self.map_cache.get_blueprints(
+            "vehicle.*:generation-2:4-wheels",
+            lambda bp_lib: sorted([
+                v for v in self._filter_bp_lib(bp_lib, "vehicle.*", "2")
+                if int(v.get_attribute("number_of_wheels")) == 4
+            ], key=(lambda vehicle_bp: vehicle_bp.id))
+        )
+        spawn_points = self.map_cache.get_spawn_points()
         num_spawns = len(spawn_points)
         if num_vehicles < num_spawns:
             random.shuffle(spawn_points)
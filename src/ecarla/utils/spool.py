@@ -0,0 +1,217 @@
+import os
+import mmap
+
+import numpy as np
+
+from ewiz.core.utils import create_dir, save_json, read_json
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+# Spool record metadata
+RECORD_DTYPE = np.dtype([
+    ("frame", np.int64),
+    ("sim_time", np.float64),
+    ("timestamp", np.float64),
+    ("offset", np.int64),
+    ("size", np.int64),
+    ("width", np.int32),
+    ("height", np.int32)
+])
+# Index file header holding the records count
+HEADER_SIZE = 64
+
+
+class SpoolFile():
+    """Append-only memory-mapped file, grown in large steps.
+    """
+    def __init__(self, path: str, start: int = 0, grow_size: int = 1 << 28) -> None:
+        self.path = path
+        self.start = start
+        self.grow_size = grow_size
+        self._init_file()
+
+    def _init_file(self) -> None:
+        """Initializes file and its mapping.
+        """
+        self.file = open(self.path, "w+b")
+        self.capacity = 0
+        self.size = self.start
+        self.map = None
+        self._grow(self.start)
+
+    def _grow(self, size: int) -> None:
+        """Grows file and remaps it to fit size bytes.
+        """
+        if size <= self.capacity:
+            return
+        if self.map is not None:
+            self.map.close()
+        self.capacity = max(size, self.capacity + self.grow_size)
+        self.file.truncate(self.capacity)
+        self.map = mmap.mmap(self.file.fileno(), self.capacity)
+
+    # === User Functions === #
+    def append(self, data: Any) -> int:
+        """Copies buffer to the end of file, returns its offset.
+        """
+        data = memoryview(data).cast("B")
+        offset = self.size
+        if data.nbytes == 0:
+            return offset
+        self._grow(offset + data.nbytes)
+        self.map[offset:offset + data.nbytes] = data
+        self.size += data.nbytes
+        return offset
+
+    def write_at(self, offset: int, data: Any) -> None:
+        """Overwrites bytes at offset.
+        """
+        data = memoryview(data).cast("B")
+        self.map[offset:offset + data.nbytes] = data
+
+    def flush(self) -> None:
+        """Flushes mapped pages to disk.
+        """
+        if self.map is not None:
+            self.map.flush()
+
+    def close(self) -> None:
+        """Trims unused capacity and closes file.
+        """
+        if self.file.closed:
+            return
+        if self.map is not None:
+            self.map.flush()
+            self.map.close()
+            self.map = None
+        self.file.truncate(self.size)
+        self.file.close()
+
+
+class SpoolWriter():
+    """Raw sensor spool, one data file and one records file per sensor.
+    """
+    def __init__(
+        self,
+        spool_dir: str,
+        sensors: Dict[str, str],
+        props: Dict[str, Any] = None,
+        grow_size: int = 1 << 28
+    ) -> None:
+        self.spool_dir = spool_dir
+        self.sensors = sensors
+        self.props = {} if props is None else props
+        self.grow_size = grow_size
+        self._init_spool()
+
+    def _init_spool(self) -> None:
+        """Initializes spool files per sensor.
+        """
+        self.spool_dir = create_dir(self.spool_dir)
+        save_json(
+            {"sensors": self.sensors, "props": self.props},
+            os.path.join(self.spool_dir, "spool.json")
+        )
+        self.data_files: Dict[str, SpoolFile] = {}
+        self.record_files: Dict[str, SpoolFile] = {}
+        self.num_records: Dict[str, int] = {}
+        for name in self.sensors.keys():
+            self.data_files[name] = SpoolFile(
+                os.path.join(self.spool_dir, name + ".raw"), grow_size=self.grow_size
+            )
+            self.record_files[name] = SpoolFile(
+                os.path.join(self.spool_dir, name + ".records"),
+                start=HEADER_SIZE, grow_size=RECORD_DTYPE.itemsize*4096
+            )
+            self.num_records[name] = 0
+
+    # === User Functions === #
+    def write(self, name: str, data: Any, sim_time: float) -> None:
+        """Appends raw sensor data and its metadata.
+        """
+        offset = self.data_files[name].append(data.raw_data)
+        record = np.zeros(1, dtype=RECORD_DTYPE)
+        record["frame"] = data.frame
+        record["sim_time"] = sim_time
+        record["timestamp"] = data.timestamp
+        record["offset"] = offset
+        record["size"] = self.data_files[name].size - offset
+        record["width"] = getattr(data, "width", 0)
+        record["height"] = getattr(data, "height", 0)
+        self.record_files[name].append(record)
+        self.num_records[name] += 1
+        # Count is written last so readers never see partial records
+        self.record_files[name].write_at(0, np.array([self.num_records[name]], dtype=np.int64))
+
+    def flush(self) -> None:
+        """Flushes spool files to disk.
+        """
+        for name in self.sensors.keys():
+            self.data_files[name].flush()
+            self.record_files[name].flush()
+
+    def close(self) -> None:
+        """Closes spool files.
+        """
+        for name in self.sensors.keys():
+            self.data_files[name].close()
+            self.record_files[name].close()
+
+
+class SpoolData():
+    """Spooled sensor data, exposing the fields used by extraction.
+    """
+    def __init__(self, raw_data: np.ndarray, record: np.void) -> None:
+        self.raw_data = raw_data
+        self.frame = int(record["frame"])
+        self.timestamp = float(record["timestamp"])
+        self.width = int(record["width"])
+        self.height = int(record["height"])
+
+
+class SpoolReader():
+    """Zero-copy reader of a raw sensor spool.
+    """
+    def __init__(self, spool_dir: str) -> None:
+        self.spool_dir = spool_dir
+        self._init_spool()
+
+    def _init_spool(self) -> None:
+        """Maps spool files of all sensors.
+        """
+        spool = read_json(os.path.join(self.spool_dir, "spool.json"))
+        self.sensors: Dict[str, str] = spool["sensors"]
+        self.props: Dict[str, Any] = spool["props"]
+        self.data: Dict[str, np.ndarray] = {}
+        self.records: Dict[str, np.ndarray] = {}
+        for name in self.sensors.keys():
+            records_path = os.path.join(self.spool_dir, name + ".records")
+            num_records = int(np.fromfile(records_path, dtype=np.int64, count=1)[0])
+            self.records[name] = np.memmap(
+                records_path, dtype=RECORD_DTYPE, mode="r",
+                offset=HEADER_SIZE, shape=(num_records,)
+            ) if num_records > 0 else np.zeros(0, dtype=RECORD_DTYPE)
+            data_path = os.path.join(self.spool_dir, name + ".raw")
+            self.data[name] = np.memmap(data_path, dtype=np.uint8, mode="r") if (
+                os.path.getsize(data_path) > 0
+            ) else np.zeros(0, dtype=np.uint8)
+
+    # === User Functions === #
+    def get_size(self, name: str) -> int:
+        """Returns number of records of sensor.
+        """
+        return self.records[name].shape[0]
+
+    def get_sim_time(self, name: str, index: int) -> float:
+        """Returns simulation time of record.
+        """
+        return float(self.records[name][index]["sim_time"])
+
+    def get_data(self, name: str, index: int) -> SpoolData:
+        """Returns record as sensor data, viewing the mapped spool.
+        """
+        record = self.records[name][index]
+        offset = int(record["offset"])
+        raw_data = self.data[name][offset:offset + int(record["size"])]
+        return SpoolData(raw_data, record)
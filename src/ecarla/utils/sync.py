@@ -1,6 +1,9 @@
-import queue
+import math
 
 from .sensor import Sensor
+from .buffer import FrameBuffer
+from .memory import get_memory_usage
+from .profiler import Profiler
 
 from typing import Any, Dict, List, Tuple, Callable
 
@@ -13,20 +16,29 @@ class SensorSync():
         world: Any,
         sensors: List[Sensor],
         delta_time: float,
-        start_time: float
+        start_time: float,
+        buffer_size: int = 16,
+        profiler: Profiler = None,
+        init_timeout: float = 30.0
     ) -> None:
         self.world = world
         self.sensors = sensors
         self.delta_time = delta_time
         self.start_time = start_time
+        self.buffer_size = buffer_size
+        self.init_timeout = init_timeout
+        self.profiler = Profiler(summary_period=None) if profiler is None else profiler
         self._init_sync()
 
     def _init_sync(self) -> None:
         """Initializes sensor synchronizer.
         """
-        self.sensors_queues = {}
+        self.world_buffer = FrameBuffer(max_size=self.buffer_size)
+        self.world_callback = None
+        self.sensors_buffers: Dict[str, FrameBuffer] = {}
         self.iter = 0
-        self.start_iter = int(self.start_time/self.delta_time)
+        self.start_elapsed = None
+        self.sim_time = 0.0
 
     # === User Functions === #
     def tick(self, timeout: float = 2.0) -> Dict[str, Any]:
@@ -37,38 +49,93 @@ class SensorSync():
             data.update({sensor.get_name(): None})
 
         # Tick simulation
-        self.world_frame = self.world.tick()
+        with self.profiler.measure("tick"):
+            self.world_frame = self.world.tick()
         data["world"] = self.world_frame
 
-        # Get sensors data
-        if self.iter >= self.start_iter:
+        # Simulation time from world snapshot
+        snapshot = self.world_buffer.get(self.world_frame, timeout=timeout)
+        if snapshot is None:
+            snapshot = self.world.get_snapshot()
+        elapsed_time = snapshot.timestamp.elapsed_seconds
+        if self.start_elapsed is None:
+            self.start_elapsed = elapsed_time
+        self.sim_time = elapsed_time - self.start_elapsed
+
+        # Get data of sensors due at this time
+        if self.sim_time >= self.start_time - 0.5*self.delta_time:
             for sensor in self.sensors:
-                data[sensor.get_name()] = sensor.read_data(
-                    world_frame=self.world_frame,
-                    sensor_queue=self.sensors_queues[sensor.get_name()],
-                    timeout=timeout
-                )
+                sensor_buffer = self.sensors_buffers[sensor.get_name()]
+                # First frame waits longer while the sensor warms up
+                sensor_timeout = timeout
+                if sensor_buffer.get_latest_timestamp() is None:
+                    sensor_timeout = max(timeout, self.init_timeout)
+                with self.profiler.measure("wait." + sensor.get_name()):
+                    data[sensor.get_name()] = sensor.read_data(
+                        world_frame=self.world_frame,
+                        sensor_buffer=sensor_buffer,
+                        elapsed_time=elapsed_time,
+                        timeout=sensor_timeout
+                    )
         self.iter += 1
         return data
 
+    def get_sim_time(self) -> float:
+        """Returns simulation time since the first tick.
+        """
+        return self.sim_time
+
+    def get_misses(self) -> Dict[str, int]:
+        """Returns missed frames per sensor.
+        """
+        return {name: b.get_misses() for name, b in self.sensors_buffers.items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns process memory and per-buffer depth, evictions and misses.
+        """
+        buffers = {"world": self.world_buffer, **self.sensors_buffers}
+        return {
+            "memory": get_memory_usage(),
+            "buffers": {
+                name: {
+                    "depth": len(b), "evictions": b.evictions, "misses": b.misses
+                }
+                for name, b in buffers.items()
+            }
+        }
+
     # === Iterator Functions === #
     def __enter__(self) -> None:
         """Initializes iterator.
         """
-        def create_queue(name: str, on_tick: Any) -> None:
-            """Creates queue.
+        def create_buffer(name: str, on_tick: Any) -> None:
+            """Creates frame buffer.
             """
-            q = queue.Queue()
-            on_tick(q.put)
-            self.sensors_queues.update({name: q})
+            b = FrameBuffer(max_size=self.buffer_size)
+            on_tick(b.put)
+            self.sensors_buffers.update({name: b})
 
-        # Create sensors queues
-        create_queue(name="world", on_tick=self.world.on_tick)
+        # Create world and sensors buffers
+        self.world_callback = self.world.on_tick(self.world_buffer.put)
         for sensor in self.sensors:
-            create_queue(name=sensor.get_name(), on_tick=sensor.get_obj().listen)
+            create_buffer(name=sensor.get_name(), on_tick=sensor.get_obj().listen)
         return self
 
     def __exit__(self, *args, **kwargs) -> None:
         """Runs on exit.
         """
-        pass
+        if self.world_callback is not None:
+            self.world.remove_on_tick(self.world_callback)
+            self.world_callback = None
+
+
+def get_capture_ticks(delta_time: float, sensors: List[Dict[str, Any]]) -> int:
+    """Returns number of ticks after which all sensor captures repeat. Sensors
+    capture from their spawn tick, every sensor tick rounded up to ticks.
+    """
+    capture_ticks = 1
+    for sensor in sensors:
+        sensor_tick = float(sensor["options"].get("sensor_tick", 0.0))
+        sensor_ticks = max(int(math.ceil(sensor_tick/delta_time - 1e-6)), 1)
+        capture_ticks = capture_ticks*sensor_ticks//math.gcd(capture_ticks, sensor_ticks)
+    return capture_ticks
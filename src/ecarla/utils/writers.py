@@ -0,0 +1,249 @@
+import os
+
+import h5py
+import numpy as np
+
+from ewiz.data.writers import WriterEvents, WriterGray, WriterFlow
+
+from .extract import EventPacket
+
+from typing import Any, Dict, List, Tuple, Callable, Union
+
+
+def _truncate_datasets(
+    data_file: h5py.File,
+    data_group: h5py.Group,
+    names: List[str],
+    size: int
+) -> bool:
+    """Truncates appendable datasets to size, removing them when empty.
+    Returns True if data is left to append to.
+    """
+    if names[0] not in data_group:
+        return False
+    if size > 0:
+        for name in names:
+            data_group[name].resize(size, axis=0)
+        return True
+    for name in names:
+        del data_group[name]
+    if "time_offset" in data_file:
+        del data_file["time_offset"]
+    return False
+
+
+class WriterEventPackets(WriterEvents):
+    """Events writer accepting columnar event packets, resumable from a
+    checkpoint.
+    """
+    def _init_events(self) -> None:
+        """Initializes events HDF5 file, reopening existing data.
+        """
+        self.events_path = os.path.join(self.out_dir, "events.hdf5")
+        self.events_file = h5py.File(self.events_path, "a")
+        self.events_flag = False
+        self.events_group = self.events_file.require_group("events")
+
+    def get_size(self) -> int:
+        """Returns number of written events.
+        """
+        return self.events_x.shape[0] if self.events_flag else 0
+
+    def resume(self, size: int) -> None:
+        """Truncates written events to size and continues appending.
+        """
+        names = ["x", "y", "time", "polarity"]
+        if _truncate_datasets(self.events_file, self.events_group, names, size):
+            self.time_offset = self.events_file["time_offset"][0]
+            self.events_x = self.events_group["x"]
+            self.events_y = self.events_group["y"]
+            self.events_time = self.events_group["time"]
+            self.events_pol = self.events_group["polarity"]
+            self.events_flag = True
+
+    def flush(self) -> None:
+        """Flushes events file to disk.
+        """
+        self.events_file.flush()
+
+    def write(self, events: Union[np.ndarray, EventPacket]) -> None:
+        """Main data writing function.
+        """
+        if not isinstance(events, EventPacket):
+            super().write(events=events)
+            return
+        if len(events) == 0:
+            return
+        if self.events_flag is False:
+            self.time_offset = 0
+            if events.t[0] != 0:
+                self.time_offset = events.t[0]
+            self._save_time_offset(
+                data_file=self.events_file, time=self.time_offset
+            )
+
+            # Create HDF5 groups
+            self.events_x = self.events_group.create_dataset(
+                name="x", data=events.x,
+                chunks=True, maxshape=(None,), dtype=np.uint16,
+                **self.compressor
+            )
+            self.events_y = self.events_group.create_dataset(
+                name="y", data=events.y,
+                chunks=True, maxshape=(None,), dtype=np.uint16,
+                **self.compressor
+            )
+            self.events_time = self.events_group.create_dataset(
+                name="time", data=events.t - self.time_offset,
+                chunks=True, maxshape=(None,), dtype=np.int64,
+                **self.compressor
+            )
+            self.events_pol = self.events_group.create_dataset(
+                name="polarity", data=events.pol,
+                chunks=True, maxshape=(None,), dtype=bool,
+                **self.compressor
+            )
+            self.events_flag = True
+        else:
+            data_points = len(events)
+            dataset_points = self.events_x.shape[0]
+            all_points = data_points + dataset_points
+            self.events_x.resize(all_points, axis=0)
+            self.events_x[-data_points:] = events.x
+            self.events_y.resize(all_points, axis=0)
+            self.events_y[-data_points:] = events.y
+            self.events_time.resize(all_points, axis=0)
+            self.events_time[-data_points:] = events.t - self.time_offset
+            self.events_pol.resize(all_points, axis=0)
+            self.events_pol[-data_points:] = events.pol
+
+
+class WriterGrayResumable(WriterGray):
+    """Grayscale writer resumable from a checkpoint.
+    """
+    def get_size(self) -> int:
+        """Returns number of written images.
+        """
+        return self.gray_images.shape[0] if self.gray_flag else 0
+
+    def resume(self, size: int) -> None:
+        """Truncates written images to size and continues appending.
+        """
+        names = ["gray_images", "time"]
+        if _truncate_datasets(self.gray_file, self.gray_file, names, size):
+            self.time_offset = self.gray_file["time_offset"][0]
+            self.gray_images = self.gray_file["gray_images"]
+            self.gray_time = self.gray_file["time"]
+            self.gray_flag = True
+
+    def flush(self) -> None:
+        """Flushes grayscale file to disk.
+        """
+        self.gray_file.flush()
+
+
+class WriterFlowResumable(WriterFlow):
+    """Flow writer resumable from a checkpoint.
+    """
+    def get_size(self) -> int:
+        """Returns number of written flows.
+        """
+        return self.flows.shape[0] if self.flow_flag else 0
+
+    def resume(self, size: int) -> None:
+        """Truncates written flows to size and continues appending.
+        """
+        names = ["flows", "time"]
+        if _truncate_datasets(self.flow_file, self.flow_file, names, size):
+            self.time_offset = self.flow_file["time_offset"][0]
+            self.flows = self.flow_file["flows"]
+            self.flows_time = self.flow_file["time"]
+            self.flow_flag = True
+
+    def flush(self) -> None:
+        """Flushes flow file to disk.
+        """
+        self.flow_file.flush()
+
+
+class EventsBuffer():
+    """Coalesces event packets in front of an events writer, writing them in
+    large contiguous chunks.
+    """
+    def __init__(
+        self,
+        events_writer: WriterEventPackets,
+        max_events: int = 1000000,
+        max_time: int = 1000000,
+        on_write: Callable[[Union[np.ndarray, EventPacket]], None] = None
+    ) -> None:
+        self.events_writer = events_writer
+        self.max_events = max_events
+        self.max_time = max_time
+        self.on_write = on_write
+        self._init_buffer()
+
+    def _init_buffer(self) -> None:
+        """Initializes packets buffer.
+        """
+        self.packets: List[Union[np.ndarray, EventPacket]] = []
+        self.num_events = 0
+        self.start_time = None
+        self.num_writes = 0
+
+    @staticmethod
+    def _get_time(events: Union[np.ndarray, EventPacket]) -> np.ndarray:
+        """Returns events timestamps.
+        """
+        return events.t if isinstance(events, EventPacket) else events[:, 2]
+
+    @staticmethod
+    def _own(events: Union[np.ndarray, EventPacket]) -> Union[np.ndarray, EventPacket]:
+        """Returns events backed by their own memory, copying views that may
+        point into sensor buffers.
+        """
+        def own(array: np.ndarray) -> np.ndarray:
+            return array if array.flags.owndata else array.copy()
+
+        if isinstance(events, EventPacket):
+            return EventPacket(*[own(field) for field in events])
+        return own(events)
+
+    def _concatenate(self) -> Union[np.ndarray, EventPacket]:
+        """Concatenates buffered packets into a single chunk.
+        """
+        if len(self.packets) == 1:
+            return self.packets[0]
+        if isinstance(self.packets[0], EventPacket):
+            return EventPacket(*[np.concatenate(field) for field in zip(*self.packets)])
+        return np.concatenate(self.packets, axis=0)
+
+    # === User Functions === #
+    def write(self, events: Union[np.ndarray, EventPacket]) -> None:
+        """Buffers events, writing once the chunk is full.
+        """
+        if len(events) == 0:
+            return
+        events_time = self._get_time(events)
+        if self.start_time is None:
+            self.start_time = events_time[0]
+        self.packets.append(self._own(events))
+        self.num_events += len(events)
+        if self.num_events >= self.max_events or (
+            events_time[-1] - self.start_time >= self.max_time
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes buffered events as a single chunk.
+        """
+        if len(self.packets) == 0:
+            return
+        events = self._concatenate()
+        self.events_writer.write(events=events)
+        if self.on_write is not None:
+            self.on_write(events)
+        self.num_writes += 1
+        self.packets = []
+        self.num_events = 0
+        self.start_time = None
@@ -0,0 +1,58 @@
+import numpy as np
+
+from src.ecarla.utils.extract import extract_flow
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+class FlowPixel():
+    """Optical flow pixel, as iterated from simulator images.
+    """
+    def __init__(self, x: float, y: float) -> None:
+        self.x = x
+        self.y = y
+
+
+class FlowImage():
+    """Synthetic optical flow image with a raw float32 buffer.
+    """
+    def __init__(self, height: int, width: int, seed: int = 0) -> None:
+        self.height = height
+        self.width = width
+        rng = np.random.default_rng(seed)
+        self.values = rng.uniform(-1.0, 1.0, (height*width, 2)).astype(np.float32)
+        self.raw_data = memoryview(self.values.tobytes())
+
+    def __iter__(self):
+        for x, y in self.values:
+            yield FlowPixel(float(x), float(y))
+
+
+def extract_flow_loop(data: Any, sim_time: float) -> Tuple[np.ndarray, int]:
+    """Per-pixel flow extraction, as done before reading the raw buffer.
+    """
+    raw_data = np.array([(p.x, p.y) for p in data], dtype=np.float64)
+    flow = raw_data.reshape((data.height, data.width, 2))
+    flow[:, :, 0] *= data.width*-0.5
+    flow[:, :, 1] *= data.height*0.5
+    flow = np.transpose(flow, (2, 0, 1))
+    time = int(sim_time*1e6)
+    return flow, time
+
+
+def test_extract_flow_matches_loop() -> None:
+    data = FlowImage(height=26, width=34)
+    flow, time, _ = extract_flow(data, sim_time=1.5)
+    expected_flow, expected_time = extract_flow_loop(data, sim_time=1.5)
+    assert flow.dtype == np.float64
+    assert flow.shape == (2, 26, 34)
+    assert time == expected_time
+    np.testing.assert_array_equal(flow, expected_flow)
+
+
+def test_extract_flow_float32() -> None:
+    data = FlowImage(height=26, width=34, seed=1)
+    flow, _, _ = extract_flow(data, sim_time=0.0, dtype=np.float32)
+    expected_flow, _ = extract_flow_loop(data, sim_time=0.0)
+    assert flow.dtype == np.float32
+    np.testing.assert_allclose(flow, expected_flow, rtol=1e-6)
@@ -0,0 +1,81 @@
+import pytest
+import numpy as np
+
+h5py = pytest.importorskip("h5py")
+pytest.importorskip("ewiz")
+
+from src.ecarla import standin
+
+# Simulation modules run on the local stand-in
+carla = standin.install(event_rate=1e5)
+
+from src.ecarla.reader import ScenarioReader
+
+from typing import Any, Dict, List, Tuple, Callable
+
+
+def get_sensors() -> List[Dict[str, Any]]:
+    """Returns decimated gray and flow sensors.
+    """
+    transform = carla.Transform(carla.Location(x=2.8, z=1.8), carla.Rotation(pitch=-15))
+    return [
+        {
+            "name": name, "type": sensor_type,
+            "options": {"sensor_tick": "0.04"}, "transform": transform, "converter": None
+        }
+        for name, sensor_type in [
+            ("gray", "sensor.camera.rgb"), ("flow", "sensor.camera.optical_flow")
+        ]
+    ]
+
+
+def create_reader(out_path: str, reader_class: type = ScenarioReader, **kwargs) -> ScenarioReader:
+    """Creates reader of stand-in recording.
+    """
+    return reader_class(
+        carla.Client("localhost", 2000), (26, 34), out_path,
+        sensors=get_sensors(), start_time=0.5, delta_time=0.01,
+        record_path="stand-in.log", record_delta_time=3.3,
+        headless=True, summary_period=None, **kwargs
+    )
+
+
+def read_times(out_path: str, name: str) -> np.ndarray:
+    """Returns absolute frame timestamps of a dataset.
+    """
+    with h5py.File(out_path + "/" + name + ".hdf5", "r") as data_file:
+        return data_file["time"][:] + data_file["time_offset"][0]
+
+
+class CrashingReader(ScenarioReader):
+    """Reader failing partway through the recording.
+    """
+    def _save_data(self, data: Dict[str, Any]) -> None:
+        if self.sim_time > 2.23:
+            raise RuntimeError("Simulated crash.")
+        super()._save_data(data)
+
+
+def test_resumed_run_matches_clean_run(tmp_path) -> None:
+    create_reader(str(tmp_path / "clean")).loop()
+    scenario_reader = create_reader(
+        str(tmp_path / "resumed"), reader_class=CrashingReader, checkpoint_period=0.3
+    )
+    scenario_reader.loop()
+    assert not scenario_reader.completed
+    scenario_reader = create_reader(
+        str(tmp_path / "resumed"), checkpoint_period=0.3, resume=True
+    )
+    scenario_reader.loop()
+    assert scenario_reader.completed
+    for name in ["gray", "flow"]:
+        times = read_times(str(tmp_path / "resumed"), name)
+        # Decimated sensors keep their capture spacing across the resume seam
+        assert set(np.diff(times).tolist()) == {40000}
+        np.testing.assert_array_equal(times, read_times(str(tmp_path / "clean"), name))
+
+
+def test_resume_without_checkpoint_is_refused(tmp_path) -> None:
+    create_reader(str(tmp_path / "out"), map_data=False).loop()
+    with pytest.raises(RuntimeError, match="without a checkpoint"):
+        create_reader(str(tmp_path / "out"), resume=True)